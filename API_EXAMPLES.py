@@ -77,6 +77,26 @@ class ServiceDeskAPI:
             print(f"✗ Failed to create ticket: {response.text}")
             return None
     
+    def create_tickets(self, tickets):
+        """
+        Create several tickets with one request
+        
+        Args:
+            tickets (list): Dicts with user_name, user_email, description,
+                asset_id and optional department/phone
+            
+        Returns:
+            dict: Response with per-ticket results
+        """
+        response = self.session.post(
+            f'{self.base_url}/api/create-tickets',
+            json={'tickets': tickets}
+        )
+        
+        result = response.json()
+        print(f"✓ Created {result.get('created', 0)} tickets, {result.get('failed', 0)} failed")
+        return result
+    
     def get_ticket(self, ticket_id):
         """Get ticket details by ID"""
         response = self.session.get(f'{self.base_url}/api/ticket/{ticket_id}')
@@ -88,8 +108,13 @@ class ServiceDeskAPI:
             return None
     
     def get_all_tickets(self, status=None, category=None, priority=None, 
-                       date_from=None, date_to=None):
-        """Get all tickets with optional filters"""
+                       date_from=None, date_to=None, fields=None):
+        """
+        Get all tickets with optional filters
+        
+        The API returns compact summary rows by default; pass fields
+        (e.g. 'full' or 'summary,corrected_description') for more columns.
+        """
         if not self.authenticated:
             print("✗ Admin authentication required")
             return []
@@ -105,17 +130,26 @@ class ServiceDeskAPI:
             params['date_from'] = date_from
         if date_to:
             params['date_to'] = date_to
+        if fields:
+            params['fields'] = fields
         
-        response = self.session.get(
-            f'{self.base_url}/admin/api/tickets',
-            params=params
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print("✗ Failed to get tickets")
-            return []
+        # Follow next_cursor until every page has been fetched
+        tickets = []
+        while True:
+            response = self.session.get(
+                f'{self.base_url}/admin/api/tickets',
+                params=params
+            )
+            
+            if response.status_code != 200:
+                print("✗ Failed to get tickets")
+                return tickets
+            
+            page = response.json()
+            tickets.extend(page['tickets'])
+            if not page.get('next_cursor'):
+                return tickets
+            params['cursor'] = page['next_cursor']
     
     def update_ticket(self, ticket_id, status=None, assigned_to=None, 
                      resolution_notes=None, priority=None):
@@ -145,7 +179,29 @@ class ServiceDeskAPI:
         else:
             print(f"✗ Failed to update ticket: {response.text}")
             return False
-    
+
+    def bulk_update_tickets(self, ticket_ids=None, filters=None, **updates):
+        """Apply one update to many tickets (by ID list or filters)"""
+        if not self.authenticated:
+            print("✗ Admin authentication required")
+            return 0
+
+        payload = dict(updates)
+        if ticket_ids is not None:
+            payload['ticket_ids'] = list(ticket_ids)
+        else:
+            payload['filters'] = filters or {}
+
+        response = self.session.put(f'{self.base_url}/admin/api/tickets/bulk', json=payload)
+
+        if response.status_code == 200:
+            updated = response.json()['updated']
+            print(f"✓ {updated} tickets updated")
+            return updated
+        else:
+            print(f"✗ Failed to update tickets: {response.text}")
+            return 0
+
     def get_statistics(self):
         """Get dashboard statistics"""
         if not self.authenticated:
@@ -377,7 +433,10 @@ def example_integration_with_external_system():
     )
     
     # Get critical tickets
-    critical_tickets = client.get_all_tickets(priority='P1 - Critical')
+    critical_tickets = client.get_all_tickets(
+        priority='P1 - Critical',
+        fields='summary,corrected_description'
+    )
     
     for ticket in critical_tickets:
         # Send to external system
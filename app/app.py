@@ -2,7 +2,7 @@
 Service Desk Automation System - Main Flask Application
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, session
+from flask import Flask, Response, render_template, request, jsonify, send_file, redirect, url_for, session
 from flask_cors import CORS
 from werkzeug.security import check_password_hash, generate_password_hash
 from functools import wraps
@@ -11,12 +11,16 @@ import os
 from datetime import datetime, timedelta
 import json
 
-# Add modules to path
+# Add modules and project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'modules'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from config import get_config
 from spelling_corrector import SpellingCorrector
 from database import TicketDatabase, ExcelReportGenerator
+from change_notifier import ChangeNotifier
 from ticket_router import TicketRouter, TicketAssignment
+from sla_scheduler import EscalationScheduler
 from email_integration import Office365Integration, EmailTicketParser
 
 
@@ -30,13 +34,34 @@ app.permanent_session_lifetime = timedelta(hours=24)
 CORS(app)
 
 # Initialize modules
-db = TicketDatabase('data/tickets/tickets.db')
+config = get_config()
+db = TicketDatabase.from_config(config)
+change_notifier = ChangeNotifier(db, poll_interval=config.EVENT_POLL_INTERVAL_SECONDS)
 # Ensure reports directory uses absolute path
 reports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'reports')
-report_gen = ExcelReportGenerator(reports_dir)
-ticket_assignment = TicketAssignment()
+report_gen = ExcelReportGenerator(reports_dir, db)
+ticket_assignment = TicketAssignment(db)
 email_service = Office365Integration()
 
+
+def notify_escalation(ticket, reason, team):
+    """Tell the team a ticket now sits with that it missed its SLA"""
+    if ticket is None:
+        return
+    team_email = ticket_assignment.router.get_team_info(team).get('email')
+    if team_email:
+        email_service.send_escalation_notification(team_email, ticket['ticket_id'], ticket, reason)
+
+
+sla_scheduler = None
+if config.AUTO_ESCALATION_ENABLED:
+    sla_scheduler = EscalationScheduler(
+        db, ticket_assignment.router,
+        escalation_hours=config.ESCALATION_HOURS,
+        on_escalate=notify_escalation
+    )
+    sla_scheduler.start()
+
 # Admin credentials (in production, use proper authentication)
 ADMIN_CREDENTIALS = {
     'admin': generate_password_hash('admin123'),
@@ -49,6 +74,13 @@ SUPPORT_CREDENTIALS = {
     'tech2': generate_password_hash('techpass2')
 }
 
+# Team queues each support login claims from (besides the teams that
+# list the user as a member in TicketRouter.SUPPORT_TEAMS)
+SUPPORT_STAFF_TEAMS = {
+    'tech1': ['Network Support', 'General Support'],
+    'tech2': ['Hardware Support', 'General Support']
+}
+
 # Department admins for IT, HR, Sales
 DEPT_ADMINS = {
     'IT': generate_password_hash('itadmin'),
@@ -98,6 +130,130 @@ def dept_admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def get_filter_args():
+    """Read ticket list filters from the request query string"""
+    filters = {}
+    for key in ('status', 'category', 'priority', 'department', 'date_from', 'date_to'):
+        if request.args.get(key):
+            filters[key] = request.args.get(key)
+    return filters
+
+
+def get_if_match_version():
+    """
+    Read the ticket version a client last saw from the If-Match header
+    
+    Returns:
+        int: Expected version, or None when the header is absent or '*'
+        
+    Raises:
+        ValueError: If the header is not a single ticket version tag
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    tags = request.if_match.as_set()
+    if len(tags) != 1 or not next(iter(tags)).isdigit():
+        raise ValueError('If-Match must be a single ticket version tag')
+    return int(next(iter(tags)))
+
+
+def ticket_response(payload, ticket, status=200):
+    """JSON response carrying the ticket version as its ETag"""
+    response = jsonify(payload)
+    response.status_code = status
+    if ticket and ticket.get('version') is not None:
+        response.set_etag(str(ticket['version']))
+    return response
+
+
+def get_fields_arg(default='summary'):
+    """Read the column projection (?fields=) for list endpoints"""
+    return request.args.get('fields') or default
+
+
+def changes_response(filters, default_fields='summary'):
+    """Answer a change feed poll (?since=) for the given list view filters"""
+    since = request.args.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return jsonify({'error': 'Invalid since value'}), 400
+    
+    try:
+        changes = db.get_changes(since, filters, limit=config.MAX_CHANGES_PER_POLL,
+                                 fields=get_fields_arg(default_fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(changes)
+
+
+def sse_event(event=None, data=None, event_id=None):
+    """Format one server-sent event"""
+    lines = []
+    if event:
+        lines.append(f'event: {event}')
+    if data is not None:
+        lines.append(f'data: {json.dumps(data)}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_stream_response(filters, default_fields='summary', statistics=False):
+    """
+    Stream ticket changes for one dashboard view as server-sent events
+    
+    Events are ticket-created, ticket-updated, ticket-removed (the ticket
+    left this view), statistics-changed (when ``statistics`` is set) and
+    reset (the client must reload). Each batch ends with a sync event
+    whose id is the change sequence number, so a reconnecting
+    EventSource resumes from Last-Event-ID. Idle streams get a heartbeat
+    comment.
+    """
+    start = request.headers.get('Last-Event-ID') or request.args.get('since')
+    fields = get_fields_arg(default_fields)
+    try:
+        since = int(start) if start else change_notifier.version
+        db.resolve_fields(fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def generate(since):
+        yield f'retry: {config.EVENT_RETRY_MS}\n\n'
+        while True:
+            version = change_notifier.wait(since, config.EVENT_HEARTBEAT_SECONDS)
+            if version == since:
+                yield ': heartbeat\n\n'
+                continue
+            
+            changes = db.get_changes(since, filters, limit=config.MAX_CHANGES_PER_POLL, fields=fields)
+            since = changes['next_since']
+            if changes['reset']:
+                yield sse_event('reset', {}, since)
+                continue
+            
+            created = set(changes['created'])
+            for ticket in changes['tickets']:
+                event = 'ticket-created' if ticket['ticket_id'] in created else 'ticket-updated'
+                yield sse_event(event, ticket)
+            for ticket_id in changes['removed']:
+                yield sse_event('ticket-removed', {'ticket_id': ticket_id})
+            if statistics and (changes['tickets'] or changes['removed']):
+                yield sse_event('statistics-changed', build_statistics())
+            yield sse_event('sync', {'since': since}, since)
+    
+    return Response(generate(since), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def get_page_args():
+    """Read keyset pagination arguments (limit, cursor) from the request"""
+    limit = request.args.get('limit', config.ITEMS_PER_PAGE, type=int)
+    limit = max(1, min(limit, config.MAX_PAGE_SIZE))
+    return limit, request.args.get('cursor') or None
+
 # ===== PUBLIC ROUTES =====
 
 @app.route('/', methods=['GET'])
@@ -106,68 +262,92 @@ def index():
     return render_template('index.html')
 
 
+def prepare_ticket(data, corrector):
+    """
+    Validate a ticket submission and run spelling correction and routing
+    
+    Args:
+        data (dict): Submitted ticket fields
+        corrector (SpellingCorrector): Corrector instance to reuse
+        
+    Returns:
+        tuple: (ticket_data, assignment) or raises ValueError when invalid
+    """
+    # Extract form data
+    user_name = data.get('user_name', '').strip()
+    user_email = data.get('user_email', '').strip()
+    department = data.get('department', '').strip()
+    phone = data.get('phone', '').strip()
+    asset_id = data.get('asset_id', '').strip()
+    description = data.get('description', '').strip()
+
+    # Validate required fields (asset_id is mandatory)
+    if not all([user_name, user_email, description, asset_id]):
+        raise ValueError('Please fill in all required fields (Name, Email, Description, Asset/System ID)')
+    
+    # Step 1: Spelling correction and normalization
+    corrected_data = corrector.process_ticket_description(description)
+    
+    # Step 2: Route ticket to appropriate team
+    # The ID is chosen up front so the member picked for it is held until it is stored
+    ticket_data = {
+        'ticket_id': db.generate_ticket_id(),
+        'user_name': user_name,
+        'user_email': user_email,
+        'department': department,
+        'phone': phone,
+        'asset_id': asset_id,
+        'original_description': corrected_data['original_description'],
+        'corrected_description': corrected_data['corrected_description'],
+        'category': corrected_data['category'],
+        'priority': corrected_data['priority'],
+        'metadata': {
+            'spelling_corrections': corrected_data['spelling_corrections'],
+            'correction_timestamp': corrected_data['timestamp']
+        }
+    }
+    
+    # Get assignment details
+    # In pull mode the ticket waits in the team queue for a technician to claim it
+    assignment = ticket_assignment.assign_ticket(
+        ticket_data, assign_member=config.TICKET_ASSIGNMENT_MODE != 'pull'
+    )
+    ticket_data['assigned_team'] = assignment['assigned_team']
+    ticket_data['assigned_to'] = assignment['assigned_to']
+    
+    return ticket_data, assignment
+
+
 @app.route('/api/create-ticket', methods=['POST'])
 def create_ticket():
     """Create a new support ticket"""
     try:
         data = request.get_json()
         
-        # Extract form data
-        user_name = data.get('user_name', '').strip()
-        user_email = data.get('user_email', '').strip()
-        department = data.get('department', '').strip()
-        phone = data.get('phone', '').strip()
-        asset_id = data.get('asset_id', '').strip()
-        description = data.get('description', '').strip()
-
-        # Validate required fields (asset_id is mandatory)
-        if not all([user_name, user_email, description, asset_id]):
+        try:
+            ticket_data, assignment = prepare_ticket(data, SpellingCorrector())
+        except ValueError as e:
             return jsonify({
                 'success': False,
-                'message': 'Please fill in all required fields (Name, Email, Description, Asset/System ID)'
+                'message': str(e)
             }), 400
+        user_name = ticket_data['user_name']
+        user_email = ticket_data['user_email']
         
-        # Step 1: Spelling correction and normalization
-        corrector = SpellingCorrector()
-        corrected_data = corrector.process_ticket_description(description)
-        
-        # Step 2: Route ticket to appropriate team
-        ticket_data = {
-            'user_name': user_name,
-            'user_email': user_email,
-            'department': department,
-            'phone': phone,
-            'asset_id': asset_id,
-            'original_description': corrected_data['original_description'],
-            'corrected_description': corrected_data['corrected_description'],
-            'category': corrected_data['category'],
-            'priority': corrected_data['priority'],
-            'metadata': {
-                'spelling_corrections': corrected_data['spelling_corrections'],
-                'correction_timestamp': corrected_data['timestamp']
-            }
-        }
-        
-        # Get assignment details
-        assignment = ticket_assignment.assign_ticket(ticket_data)
-        ticket_data['assigned_to'] = assignment['assigned_to']
-        
-        # Step 3: Store in database
-        ticket_id = db.create_ticket(ticket_data)
-        
-        # Step 4: Update with assignment info
-        db.update_ticket(ticket_id, {
-            'assigned_to': assignment['assigned_to'],
-            'status': 'Assigned'
-        })
+        # Step 3: Store in database, already assigned
+        try:
+            ticket_id = db.create_assigned_ticket(ticket_data)
+        except Exception:
+            ticket_assignment.release(assignment)
+            raise
         
-        # Step 5: Send notifications
+        # Step 4: Send notifications
         try:
             # Send confirmation to user
             email_service.send_ticket_confirmation(
                 user_email,
                 ticket_id,
-                corrected_data['corrected_description'][:100],
+                ticket_data['corrected_description'][:100],
                 assignment['team_email']
             )
             
@@ -193,7 +373,7 @@ def create_ticket():
                 'category': ticket_data['category'],
                 'priority': ticket_data['priority'],
                 'assigned_to': assignment['assigned_to'],
-                'status': 'Assigned'
+                'status': assignment['status']
             }
         }), 201
     
@@ -204,19 +384,81 @@ def create_ticket():
         }), 500
 
 
+@app.route('/api/create-tickets', methods=['POST'])
+def create_tickets():
+    """Create a batch of tickets in a single transaction"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('tickets')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'message': 'A non-empty "tickets" list is required'
+            }), 400
+        if len(items) > config.MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'message': f'Batch exceeds the limit of {config.MAX_BATCH_SIZE} tickets'
+            }), 400
+        
+        # Run the spelling and routing pipeline over the whole batch
+        corrector = SpellingCorrector()
+        results = []
+        prepared = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results.append({'index': index, 'success': False, 'message': 'Ticket must be an object'})
+                continue
+            try:
+                ticket_data, assignment = prepare_ticket(item, corrector)
+            except ValueError as e:
+                results.append({'index': index, 'success': False, 'message': str(e)})
+                continue
+            results.append({'index': index, 'success': True})
+            prepared.append((results[-1], ticket_data, assignment))
+        
+        # Store every valid ticket, already assigned, with one commit
+        try:
+            ticket_ids = db.create_tickets([ticket_data for _, ticket_data, _ in prepared], assign=True)
+        except Exception:
+            for _, _, assignment in prepared:
+                ticket_assignment.release(assignment)
+            raise
+        for ticket_id, (result, ticket_data, assignment) in zip(ticket_ids, prepared):
+            result.update({
+                'ticket_id': ticket_id,
+                'category': ticket_data['category'],
+                'priority': ticket_data['priority'],
+                'assigned_to': assignment['assigned_to'],
+                'status': assignment['status']
+            })
+        
+        created = len(ticket_ids)
+        return jsonify({
+            'success': created > 0,
+            'created': created,
+            'failed': len(items) - created,
+            'results': results
+        }), 201 if created else 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error creating tickets: {str(e)}'
+        }), 500
+
+
 @app.route('/api/ticket/<ticket_id>', methods=['GET'])
 def get_ticket_details(ticket_id):
     """Get ticket details with history"""
     try:
-        # Get ticket from database
-        ticket = db.get_ticket(ticket_id)
+        # Get ticket and its history from database
+        ticket, history = db.get_ticket_record(ticket_id)
         
         if not ticket:
             return jsonify({'error': 'Ticket not found'}), 404
         
-        # Get ticket history
-        history = db.get_ticket_history(ticket_id) if hasattr(db, 'get_ticket_history') else []
-        
         # Return detailed ticket info
         return jsonify({
             'success': True,
@@ -245,18 +487,25 @@ def search_tickets():
                 'tickets': []
             }), 400
         
-        # Get all tickets and filter by email
-        all_tickets = db.get_all_tickets()
-        matching_tickets = [
-            t for t in all_tickets 
-            if t.get('user_email', '').lower() == email
-        ]
+        limit = request.args.get('limit', config.MAX_SEARCH_RESULTS, type=int)
+        limit = max(1, min(limit, config.MAX_SEARCH_RESULTS))
+        try:
+            matching_tickets, next_cursor, total = db.search_tickets_by_email(
+                email, limit=limit, cursor=request.args.get('cursor') or None
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e),
+                'tickets': []
+            }), 400
         
         if matching_tickets:
             return jsonify({
                 'success': True,
                 'tickets': matching_tickets,
-                'total': len(matching_tickets)
+                'total': total,
+                'next_cursor': next_cursor
             }), 200
         else:
             return jsonify({
@@ -335,23 +584,46 @@ def admin_dashboard():
 @login_required
 def get_tickets():
     """Get all tickets with filters"""
-    filters = {}
+    filters = get_filter_args()
+    limit, cursor = get_page_args()
+    try:
+        tickets, next_cursor = db.get_ticket_page(filters, limit=limit, cursor=cursor,
+                                                  fields=get_fields_arg())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'tickets': tickets, 'next_cursor': next_cursor})
+
+
+@app.route('/admin/api/changes', methods=['GET'])
+@login_required
+def get_ticket_changes():
+    """Get tickets changed since a change sequence number"""
+    return changes_response(get_filter_args())
+
+
+@app.route('/admin/api/search', methods=['GET'])
+@login_required
+def search_ticket_text():
+    """Ranked full-text search over ticket descriptions and resolution notes"""
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({'error': 'Search text (q) is required'}), 400
     
-    if request.args.get('status'):
-        filters['status'] = request.args.get('status')
-    if request.args.get('category'):
-        filters['category'] = request.args.get('category')
-    if request.args.get('priority'):
-        filters['priority'] = request.args.get('priority')
-    if request.args.get('date_from'):
-        filters['date_from'] = request.args.get('date_from')
-    if request.args.get('date_to'):
-        filters['date_to'] = request.args.get('date_to')
+    limit, cursor = get_page_args()
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
-    tickets = db.get_all_tickets(filters)
-    # Convert sqlite3.Row objects to dictionaries for JSON serialization
-    tickets_list = [dict(ticket) if isinstance(ticket, dict) else dict(ticket) for ticket in tickets] if tickets else []
-    return jsonify(tickets_list)
+    try:
+        tickets, next_offset = db.search_tickets(text, get_filter_args(), limit=limit, offset=max(offset, 0),
+                                                 fields=get_fields_arg())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'tickets': tickets,
+        'next_cursor': str(next_offset) if next_offset is not None else None
+    })
 
 
 @app.route('/admin/api/ticket/<ticket_id>', methods=['GET', 'PUT'])
@@ -359,13 +631,17 @@ def get_tickets():
 def manage_ticket(ticket_id):
     """Get or update ticket"""
     if request.method == 'GET':
-        ticket = db.get_ticket(ticket_id)
+        ticket, history = db.get_ticket_record(ticket_id)
         if not ticket:
             return jsonify({'error': 'Ticket not found'}), 404
-        history = db.get_ticket_history(ticket_id)
-        return jsonify({'ticket': ticket, 'history': history})
+        return ticket_response({'ticket': ticket, 'history': history}, ticket)
     
     elif request.method == 'PUT':
+        try:
+            version = get_if_match_version()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         data = request.get_json()
         updates = {}
         
@@ -381,46 +657,117 @@ def manage_ticket(ticket_id):
         if updates:
             # Record who performed the update
             updates['performed_by'] = session.get('user', 'System')
-            db.update_ticket(ticket_id, updates)
-            return jsonify({'success': True, 'message': 'Ticket updated'})
+            try:
+                applied = db.update_ticket(ticket_id, updates, expected_version=version)
+            except ValueError as e:
+                # Archived tickets are read-only
+                return jsonify({'error': str(e)}), 409
+            if not applied:
+                ticket = db.get_ticket(ticket_id)
+                if not ticket:
+                    return jsonify({'error': 'Ticket not found'}), 404
+                return version_conflict_response(ticket)
+            return ticket_response({'success': True, 'message': 'Ticket updated'},
+                                   {'version': version + 1} if version is not None else None)
         
         return jsonify({'error': 'No valid updates provided'}), 400
 
 
+@app.route('/admin/api/tickets/bulk', methods=['PUT'])
+@login_required
+def bulk_update_tickets():
+    """Apply one update to many tickets, selected by ID list or filters"""
+    data = request.get_json() or {}
+    updates = {key: data[key] for key in ('status', 'assigned_to', 'resolution_notes', 'priority') if key in data}
+    if not updates:
+        return jsonify({'error': 'No valid updates provided'}), 400
+
+    ticket_ids = data.get('ticket_ids')
+    filters = data.get('filters')
+    if ticket_ids is not None:
+        if not isinstance(ticket_ids, list) or not all(isinstance(ticket_id, str) for ticket_id in ticket_ids):
+            return jsonify({'error': '"ticket_ids" must be a list of ticket IDs'}), 400
+        if len(ticket_ids) > config.MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch exceeds the limit of {config.MAX_BATCH_SIZE} tickets'}), 400
+        selection = ticket_ids
+    elif isinstance(filters, dict):
+        selection = {key: filters[key] for key in ('status', 'category', 'priority', 'assigned_to',
+                                                   'department', 'date_from', 'date_to') if filters.get(key)}
+    else:
+        return jsonify({'error': 'Provide "ticket_ids" or "filters"'}), 400
+
+    try:
+        updated = db.bulk_update(selection, updates, performed_by=session.get('user', 'System'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'updated': len(updated), 'ticket_ids': updated})
+
+
+def version_conflict_response(ticket):
+    """412 response for an update based on an outdated ticket version"""
+    return ticket_response({
+        'error': 'Ticket was changed by someone else; reload it and try again',
+        'version': ticket.get('version')
+    }, ticket, 412)
+
+
+def build_statistics(filters=None):
+    """Build the dashboard statistics payload"""
+    counts = db.get_statistics(filters)
+    by_status = counts['by_status']
+    by_priority = counts['by_priority']
+    
+    return {
+        'total_tickets': counts['total'],
+        'open_tickets': by_status.get('Open', 0),
+        'assigned_tickets': by_status.get('Assigned', 0),
+        'resolved_tickets': by_status.get('Resolved', 0),
+        'closed_tickets': by_status.get('Closed', 0),
+        'critical_tickets': by_priority.get('P1 - Critical', 0),
+        'high_priority': by_priority.get('P2 - High', 0),
+        'by_category': counts['by_category'],
+    }
+
+
 @app.route('/admin/api/statistics', methods=['GET'])
 @login_required
 def get_statistics():
     """Get dashboard statistics"""
-    all_tickets = db.get_all_tickets()
-    
-    stats = {
-        'total_tickets': len(all_tickets),
-        'open_tickets': len([t for t in all_tickets if t.get('status') == 'Open']),
-        'assigned_tickets': len([t for t in all_tickets if t.get('status') == 'Assigned']),
-        'resolved_tickets': len([t for t in all_tickets if t.get('status') == 'Resolved']),
-        'closed_tickets': len([t for t in all_tickets if t.get('status') == 'Closed']),
-        'critical_tickets': len([t for t in all_tickets if t.get('priority') == 'P1 - Critical']),
-        'high_priority': len([t for t in all_tickets if t.get('priority') == 'P2 - High']),
-    }
-    
-    # Category breakdown
-    categories = {}
-    for ticket in all_tickets:
-        cat = ticket.get('category', 'General')
-        categories[cat] = categories.get(cat, 0) + 1
-    
-    stats['by_category'] = categories
-    
+    try:
+        stats = build_statistics(get_filter_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(stats)
 
 
+@app.route('/admin/api/events', methods=['GET'])
+@login_required
+def admin_events():
+    """Server-sent ticket and statistics events for the admin dashboard"""
+    return event_stream_response(get_filter_args(), statistics=True)
+
+
+@app.route('/admin/api/metrics', methods=['GET'])
+@login_required
+def get_metrics():
+    """Get database write queue and ticket cache metrics"""
+    return jsonify({
+        'write_queue': db.get_write_metrics(),
+        'ticket_cache': db.get_cache_metrics()
+    })
+
+
 @app.route('/admin/api/reports/download', methods=['GET'])
 @login_required
 def download_report():
     """Download report in Excel format"""
     report_type = request.args.get('type', 'all')
     
-    all_tickets = db.get_all_tickets()
+    try:
+        # A date range limits the report (and the partitions it reads)
+        all_tickets = db.get_all_tickets(get_filter_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     try:
         filepath = None
@@ -463,9 +810,10 @@ def get_report_types():
 @app.route('/admin/api/teams', methods=['GET'])
 @login_required
 def get_teams():
-    """Get support teams information"""
-    router = TicketRouter()
-    teams = router.SUPPORT_TEAMS
+    """Get support teams information with their current open-ticket load"""
+    router = ticket_assignment.router
+    load = router.get_team_load()
+    teams = {name: dict(team, load=load[name]) for name, team in router.SUPPORT_TEAMS.items()}
     return jsonify(teams)
 
 
@@ -509,20 +857,54 @@ def support_dashboard():
 def support_get_tickets():
     username = session.get('user')
     filters = {'assigned_to': username}
-    tickets = db.get_all_tickets(filters)
-    return jsonify({'tickets': tickets})
+    limit, cursor = get_page_args()
+    try:
+        tickets, next_cursor = db.get_ticket_page(filters, limit=limit, cursor=cursor,
+                                                  fields=get_fields_arg('summary,corrected_description,original_description'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'tickets': tickets, 'next_cursor': next_cursor})
+
+
+@app.route('/support/api/changes', methods=['GET'])
+@support_required
+def support_get_changes():
+    return changes_response({'assigned_to': session.get('user')},
+                            'summary,corrected_description,original_description')
+
+
+@app.route('/support/api/events', methods=['GET'])
+@support_required
+def support_events():
+    """Server-sent events for tickets assigned to the logged-in technician"""
+    return event_stream_response({'assigned_to': session.get('user')},
+                                 'summary,corrected_description,original_description')
+
+
+@app.route('/support/api/claim-next', methods=['POST'])
+@support_required
+def support_claim_next():
+    """Claim the most urgent waiting ticket from the technician's team queues"""
+    username = session.get('user')
+    teams = SUPPORT_STAFF_TEAMS.get(username, []) + ticket_assignment.router.get_member_teams(username)
+    if not teams:
+        return jsonify({'error': 'You are not on a support team'}), 403
+
+    ticket = db.claim_next_ticket(list(dict.fromkeys(teams)), username,
+                                  lease_seconds=config.CLAIM_LEASE_MINUTES * 60)
+    if ticket is None:
+        return jsonify({'ticket': None, 'message': 'No tickets waiting in your queues'})
+    return ticket_response({'ticket': ticket}, ticket)
 
 
 @app.route('/support/api/ticket/<ticket_id>', methods=['PUT'])
 @support_required
 def support_update_ticket(ticket_id):
     username = session.get('user')
-    ticket = db.get_ticket(ticket_id)
-    if not ticket:
-        return jsonify({'error': 'Ticket not found'}), 404
-    # Only assigned support can update
-    if ticket.get('assigned_to') != username:
-        return jsonify({'error': 'Not authorized to update this ticket'}), 403
+    try:
+        version = get_if_match_version()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     data = request.get_json()
     updates = {}
@@ -530,11 +912,25 @@ def support_update_ticket(ticket_id):
         updates['status'] = data['status']
     if 'resolution_notes' in data:
         updates['resolution_notes'] = data['resolution_notes']
-    if updates:
-        updates['performed_by'] = username
-        db.update_ticket(ticket_id, updates)
-        return jsonify({'success': True}), 200
-    return jsonify({'error': 'No updates provided'}), 400
+    if not updates:
+        return jsonify({'error': 'No updates provided'}), 400
+
+    updates['performed_by'] = username
+    try:
+        # Only assigned support can update; checked by the update itself
+        applied = db.update_ticket(ticket_id, updates, expected_version=version, assigned_to=username)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    if applied:
+        return ticket_response({'success': True}, {'version': version + 1} if version is not None else None)
+
+    # Not applied: find out why
+    ticket = db.get_ticket(ticket_id)
+    if not ticket:
+        return jsonify({'error': 'Ticket not found'}), 404
+    if ticket.get('assigned_to') != username:
+        return jsonify({'error': 'Not authorized to update this ticket'}), 403
+    return version_conflict_response(ticket)
 
 
 # ===== DEPARTMENT ADMIN ROUTES =====
@@ -572,8 +968,34 @@ def department_get_tickets(dept):
     # Ensure the logged-in department admin matches the requested department
     if session.get('department') != dept_key:
         return jsonify({'error': 'Not authorized for this department'}), 403
-    tickets = db.get_all_tickets({'department': dept_key})
-    return jsonify({'tickets': tickets})
+    limit, cursor = get_page_args()
+    try:
+        tickets, next_cursor = db.get_ticket_page({'department': dept_key}, limit=limit, cursor=cursor,
+                                                  fields=get_fields_arg('summary,corrected_description,original_description'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'tickets': tickets, 'next_cursor': next_cursor})
+
+
+@app.route('/department/<dept>/api/changes', methods=['GET'])
+@dept_admin_required
+def department_get_changes(dept):
+    dept_key = dept.capitalize()
+    if session.get('department') != dept_key:
+        return jsonify({'error': 'Not authorized for this department'}), 403
+    return changes_response({'department': dept_key},
+                            'summary,corrected_description,original_description')
+
+
+@app.route('/department/<dept>/api/events', methods=['GET'])
+@dept_admin_required
+def department_events(dept):
+    """Server-sent events for one department's tickets"""
+    dept_key = dept.capitalize()
+    if session.get('department') != dept_key:
+        return jsonify({'error': 'Not authorized for this department'}), 403
+    return event_stream_response({'department': dept_key},
+                                 'summary,corrected_description,original_description')
 
 
 # ===== ERROR HANDLERS =====
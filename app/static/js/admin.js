@@ -3,11 +3,19 @@
  */
 
 let currentTicketId = null;
+let currentTicketVersion = null;
+let ticketsNextCursor = null;
+let changesSince = null;
+let eventSource = null;
 let statsChart = null;
 let categoryChart = null;
 let statusChart = null;
 
-document.addEventListener('DOMContentLoaded', function() {
+document.addEventListener('DOMContentLoaded', async function() {
+    // Take the change feed position before loading, so nothing committed
+    // during the initial load is missed
+    await startChangeFeed();
+
     // Load initial data (wrapped to avoid unhandled exceptions)
     try {
         loadStatistics();
@@ -25,14 +33,136 @@ document.addEventListener('DOMContentLoaded', function() {
         console.error('loadTeams failed', e);
     }
 
-    // Set up chart update interval
+    // Live updates pushed by the server; poll the change feed where
+    // EventSource is unavailable
     try {
-        setInterval(loadStatistics, 30000); // Refresh every 30 seconds
+        if (!connectEvents()) setInterval(pollChanges, 30000); // Check every 30 seconds
     } catch (e) {
-        console.error('setInterval failed', e);
+        console.error('connectEvents failed', e);
     }
 });
 
+/**
+ * Build the list filter query parameters from the filter controls
+ */
+function getFilterParams() {
+    const queryParams = new URLSearchParams();
+    const status = document.getElementById('statusFilter')?.value || '';
+    const category = document.getElementById('categoryFilter')?.value || '';
+    const priority = document.getElementById('priorityFilter')?.value || '';
+    if (status) queryParams.append('status', status);
+    if (category) queryParams.append('category', category);
+    if (priority) queryParams.append('priority', priority);
+    return queryParams;
+}
+
+/**
+ * Record the current change sequence number
+ */
+async function startChangeFeed() {
+    try {
+        const response = await fetch('/admin/api/changes');
+        if (response.ok) changesSince = (await response.json()).next_since;
+    } catch (e) {
+        console.error('startChangeFeed failed', e);
+    }
+}
+
+/**
+ * Subscribe to server-sent ticket and statistics events for the current filters
+ * Returns false when the browser has no EventSource support
+ */
+function connectEvents() {
+    if (!window.EventSource) return false;
+    if (eventSource) eventSource.close();
+
+    const queryParams = getFilterParams();
+    if (changesSince !== null) queryParams.append('since', changesSince);
+    eventSource = new EventSource(`/admin/api/events?${queryParams}`);
+
+    const upsert = e => applyTicketChanges([JSON.parse(e.data)], []);
+    eventSource.addEventListener('ticket-created', upsert);
+    eventSource.addEventListener('ticket-updated', upsert);
+    eventSource.addEventListener('ticket-removed', e => applyTicketChanges([], [JSON.parse(e.data).ticket_id]));
+    eventSource.addEventListener('statistics-changed', e => renderStatistics(JSON.parse(e.data)));
+    eventSource.addEventListener('sync', e => { changesSince = JSON.parse(e.data).since; });
+    eventSource.addEventListener('reset', e => {
+        changesSince = Number(e.lastEventId);
+        loadStatistics();
+        loadTickets();
+    });
+    return true;
+}
+
+/**
+ * Fetch tickets changed since the last poll and apply them to the page
+ */
+async function pollChanges() {
+    if (changesSince === null) {
+        await startChangeFeed();
+        return;
+    }
+    try {
+        let changes;
+        do {
+            const queryParams = getFilterParams();
+            queryParams.append('since', changesSince);
+            const response = await fetch(`/admin/api/changes?${queryParams}`);
+            if (!response.ok) {
+                console.error('Failed to fetch changes', response.status);
+                return;
+            }
+            changes = await response.json();
+            changesSince = changes.next_since;
+
+            if (changes.reset) {
+                // Change log no longer covers our position; start over
+                loadStatistics();
+                loadTickets();
+                return;
+            }
+            applyTicketChanges(changes.tickets || [], changes.removed || []);
+        } while (changes.has_more);
+
+        if ((changes.tickets || []).length || (changes.removed || []).length) {
+            loadStatistics();
+        }
+    } catch (error) {
+        console.error('Error polling changes:', error);
+    }
+}
+
+/**
+ * Update, insert or drop ticket table rows from a change feed delta
+ */
+function applyTicketChanges(tickets, removed) {
+    const tbody = document.getElementById('ticketsTableBody');
+    if (!tbody) return;
+    const searching = (document.getElementById('searchText')?.value || '').trim() !== '';
+
+    removed.forEach(ticketId => {
+        const row = tbody.querySelector(`tr[data-ticket-id="${ticketId}"]`);
+        if (row) row.remove();
+    });
+
+    // Changes arrive newest first; insert oldest first so order is kept
+    tickets.slice().reverse().forEach(ticket => {
+        const row = tbody.querySelector(`tr[data-ticket-id="${ticket.ticket_id}"]`);
+        if (row) {
+            row.outerHTML = renderTicketRow(ticket);
+            return;
+        }
+        // Search results are ranked; only refresh rows already shown there
+        if (searching) return;
+        const first = tbody.querySelector('tr[data-ticket-id]');
+        if (!first) {
+            tbody.innerHTML = renderTicketRow(ticket);
+        } else if ((ticket.created_timestamp || '') >= first.dataset.created) {
+            first.insertAdjacentHTML('beforebegin', renderTicketRow(ticket));
+        }
+    });
+}
+
 /**
  * Show specific tab
  */
@@ -92,8 +222,17 @@ async function loadStatistics() {
             console.error('Failed to load statistics', response.status);
             return;
         }
-        const stats = await response.json();
+        renderStatistics(await response.json());
+    } catch (error) {
+        console.error('Error loading statistics:', error);
+    }
+}
 
+/**
+ * Show statistics on the stat cards and category chart
+ */
+function renderStatistics(stats) {
+    try {
         // Update stat cards (guard elements exist)
         const totalEl = document.getElementById('totalTickets');
         const resolvedEl = document.getElementById('resolvedTickets');
@@ -107,37 +246,38 @@ async function loadStatistics() {
         // Update category chart
         try { updateCategoryChart(stats.by_category || {}); } catch (e) { console.error(e); }
     } catch (error) {
-        console.error('Error loading statistics:', error);
+        console.error('Error rendering statistics:', error);
     }
 }
 
 /**
- * Load all tickets
+ * Load first page of tickets (or the next page when append is true)
  */
-async function loadTickets() {
+async function loadTickets(append = false) {
+    // Resubscribe so pushed changes follow the new filters
+    if (!append && eventSource) connectEvents();
     try {
-        const filters = {
-            status: document.getElementById('statusFilter')?.value || '',
-            category: document.getElementById('categoryFilter')?.value || '',
-            priority: document.getElementById('priorityFilter')?.value || ''
-        };
+        const searchText = (document.getElementById('searchText')?.value || '').trim();
         
         // Build query string
-        const queryParams = new URLSearchParams();
-        if (filters.status) queryParams.append('status', filters.status);
-        if (filters.category) queryParams.append('category', filters.category);
-        if (filters.priority) queryParams.append('priority', filters.priority);
+        const queryParams = getFilterParams();
+        if (searchText) queryParams.append('q', searchText);
+        if (append && ticketsNextCursor) queryParams.append('cursor', ticketsNextCursor);
         
-        const response = await fetch(`/admin/api/tickets?${queryParams}`);
+        // Text searches are ranked by relevance, plain listings by date
+        const endpoint = searchText ? '/admin/api/search' : '/admin/api/tickets';
+        const response = await fetch(`${endpoint}?${queryParams}`);
         if (!response.ok) {
             console.error('Failed to fetch tickets', response.status);
             const tbodyErr = document.getElementById('ticketsTableBody');
-            if (tbodyErr) tbodyErr.innerHTML = '<tr><td colspan="8" class="text-center text-danger py-4">Failed to load tickets</td></tr>';
+            if (tbodyErr && !append) tbodyErr.innerHTML = '<tr><td colspan="8" class="text-center text-danger py-4">Failed to load tickets</td></tr>';
             return;
         }
 
-        const tickets = await response.json();
-        console.log('Tickets fetched:', tickets);
+        const page = await response.json();
+        const tickets = page.tickets || [];
+        ticketsNextCursor = page.next_cursor || null;
+        updateLoadMoreButton();
 
         // Populate table
         const tbody = document.getElementById('ticketsTableBody');
@@ -145,17 +285,56 @@ async function loadTickets() {
             console.error('tbody element not found');
             return;
         }
-        if (!Array.isArray(tickets) || tickets.length === 0) {
+        if (!append && tickets.length === 0) {
             tbody.innerHTML = '<tr><td colspan="8" class="text-center text-muted py-4">No tickets found</td></tr>';
             return;
         }
 
-        tbody.innerHTML = tickets.map(ticket => `
-            <tr>
+        const rows = tickets.map(renderTicketRow).join('');
+        if (append) {
+            tbody.insertAdjacentHTML('beforeend', rows);
+        } else {
+            tbody.innerHTML = rows;
+        }
+        console.log('Table populated with', tbody.rows.length, 'tickets');
+    } catch (error) {
+        console.error('Error loading tickets:', error);
+        const tbody = document.getElementById('ticketsTableBody');
+        if (tbody && !append) tbody.innerHTML = '<tr><td colspan="8" class="text-center text-danger py-4">Error: ' + error.message + '</td></tr>';
+    }
+}
+
+/**
+ * Append the next page of tickets
+ */
+function loadMoreTickets() {
+    if (ticketsNextCursor) {
+        loadTickets(true);
+    }
+}
+
+/**
+ * Show the "Load more" control only while more pages exist
+ */
+function updateLoadMoreButton() {
+    const footer = document.getElementById('loadMoreTickets');
+    if (footer) footer.classList.toggle('d-none', !ticketsNextCursor);
+}
+
+/**
+ * Render one ticket table row
+ * (search snippets arrive HTML-escaped from the server with <mark> highlights)
+ */
+function renderTicketRow(ticket) {
+    return `
+            <tr data-ticket-id="${ticket.ticket_id}" data-created="${ticket.created_timestamp || ''}">
                 <td>
                     <strong><a href="#" onclick="showTicketDetail('${ticket.ticket_id}'); return false;">${ticket.ticket_id}</a></strong>
                 </td>
-                <td>${escapeHtml(ticket.user_name || '')}</td>
+                <td>
+                    ${escapeHtml(ticket.user_name || '')}
+                    ${ticket.snippet ? `<div class="small text-muted">${ticket.snippet}</div>` : ''}
+                </td>
                 <td><span class="badge bg-info">${escapeHtml(ticket.category || 'General')}</span></td>
                 <td>${getPriorityBadge(ticket.priority || 'P3 - Medium')}</td>
                 <td>${getStatusBadge(ticket.status || 'Open')}</td>
@@ -167,13 +346,7 @@ async function loadTickets() {
                     </button>
                 </td>
             </tr>
-        `).join('');
-        console.log('Table populated with', tickets.length, 'tickets');
-    } catch (error) {
-        console.error('Error loading tickets:', error);
-        const tbody = document.getElementById('ticketsTableBody');
-        if (tbody) tbody.innerHTML = '<tr><td colspan="8" class="text-center text-danger py-4">Error: ' + error.message + '</td></tr>';
-    }
+        `;
 }
 
 /**
@@ -195,6 +368,11 @@ async function loadTeams() {
                     <p class="text-muted small mb-2">
                         <strong>Capacity:</strong> ${teamData.members.length} members
                     </p>
+                    <p class="text-muted small mb-2">
+                        <strong>Open tickets:</strong> ${teamData.load ? teamData.load.open_tickets : 0} / ${teamData.max_capacity}
+                        <br><small>${Object.entries(teamData.load ? teamData.load.members : {})
+                            .map(([member, count]) => `${escapeHtml(member)}: ${count}`).join(', ')}</small>
+                    </p>
                     <p class="text-muted small">
                         <strong>Expertise:</strong><br>
                         <small>${(teamData.expertise || []).join(', ') || 'General'}</small>
@@ -218,6 +396,7 @@ async function showTicketDetail(ticketId) {
         
         const ticket = data.ticket;
         const history = data.history || [];
+        currentTicketVersion = ticket.version;
         
         const modalBody = document.getElementById('modalBody');
         modalBody.innerHTML = `
@@ -323,12 +502,18 @@ async function updateTicketStatus() {
     const assignedTo = document.getElementById('modalAssignedTo').value;
     const notes = document.getElementById('modalNotes').value;
     
+    const headers = {
+        'Content-Type': 'application/json'
+    };
+    if (currentTicketVersion !== null && currentTicketVersion !== undefined) {
+        // Reject the save if someone else changed the ticket meanwhile
+        headers['If-Match'] = `"${currentTicketVersion}"`;
+    }
+    
     try {
         const response = await fetch(`/admin/api/ticket/${currentTicketId}`, {
             method: 'PUT',
-            headers: {
-                'Content-Type': 'application/json'
-            },
+            headers: headers,
             body: JSON.stringify({
                 assigned_to: assignedTo,
                 resolution_notes: notes
@@ -339,6 +524,10 @@ async function updateTicketStatus() {
             alert('Ticket updated successfully');
             loadTickets();
             bootstrap.Modal.getInstance(document.getElementById('ticketModal')).hide();
+        } else if (response.status === 412) {
+            alert('This ticket was changed by someone else. The latest version has been loaded.');
+            bootstrap.Modal.getInstance(document.getElementById('ticketModal')).hide();
+            showTicketDetail(currentTicketId);
         } else {
             alert('Failed to update ticket');
         }
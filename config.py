@@ -25,6 +25,38 @@ class Config:
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/tickets/tickets.db')
     REPORT_OUTPUT_PATH = os.getenv('REPORT_OUTPUT_PATH', 'data/reports')
     
+    # SQLite Connection Settings
+    SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', 8))
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 16384))  # per connection
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 64 * 1024 * 1024))  # bytes, 0 disables
+    # Route all writes through one writer thread that commits them in groups
+    SQLITE_GROUP_COMMIT = os.getenv('SQLITE_GROUP_COMMIT', 'False') == 'True'
+    SQLITE_GROUP_COMMIT_DELAY_MS = float(os.getenv('SQLITE_GROUP_COMMIT_DELAY_MS', 2))
+    SQLITE_GROUP_COMMIT_MAX_BATCH = int(os.getenv('SQLITE_GROUP_COMMIT_MAX_BATCH', 256))
+    # Refuse to start if a hot query falls back to a full table scan
+    # (always on in debug mode)
+    SQLITE_CHECK_QUERY_PLANS = os.getenv('SQLITE_CHECK_QUERY_PLANS', 'False') == 'True'
+    
+    # Ticket detail cache (ticket + history records, LRU); 0 disables
+    TICKET_CACHE_SIZE = int(os.getenv('TICKET_CACHE_SIZE', 1024))
+    
+    # Monthly partition files for archived (closed, old) tickets
+    TICKET_PARTITIONING = os.getenv('TICKET_PARTITIONING', 'False') == 'True'
+    TICKET_PARTITION_DIR = os.getenv('TICKET_PARTITION_DIR', 'data/tickets/partitions')
+    
+    # Ticket intake: 'push' assigns a team member at creation, 'pull' leaves
+    # tickets in their team queue for technicians to claim
+    TICKET_ASSIGNMENT_MODE = os.getenv('TICKET_ASSIGNMENT_MODE', 'push')
+    CLAIM_LEASE_MINUTES = int(os.getenv('CLAIM_LEASE_MINUTES', 30))
+    
+    # Server-sent dashboard events (needs a threaded or async worker)
+    EVENT_POLL_INTERVAL_SECONDS = float(os.getenv('EVENT_POLL_INTERVAL_SECONDS', 1.0))
+    EVENT_HEARTBEAT_SECONDS = int(os.getenv('EVENT_HEARTBEAT_SECONDS', 15))
+    EVENT_RETRY_MS = int(os.getenv('EVENT_RETRY_MS', 3000))
+    
     # Email Configuration
     SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.office365.com')
     SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
@@ -85,11 +117,16 @@ class Config:
     DEFAULT_PRIORITY = 'P3 - Medium'
     DEFAULT_CATEGORY = 'General'
     TICKET_ID_PREFIX = 'TKT'
-    AUTO_ESCALATION_ENABLED = True
-    ESCALATION_HOURS = 8
+    MAX_BATCH_SIZE = 500  # tickets per /api/create-tickets request
+    MAX_CHANGES_PER_POLL = 500  # change log entries per /api/changes request
+    # Run the SLA escalation scheduler in each app process
+    AUTO_ESCALATION_ENABLED = os.getenv('AUTO_ESCALATION_ENABLED', 'True') == 'True'
+    # Repeat escalations of tickets past their resolution target
+    ESCALATION_HOURS = float(os.getenv('ESCALATION_HOURS', 8))
     
     # UI Settings
     ITEMS_PER_PAGE = 25
+    MAX_PAGE_SIZE = 100  # largest limit accepted by the ticket list endpoints
     MAX_SEARCH_RESULTS = 100
     
     # Logging
@@ -108,9 +145,6 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     TESTING = False
-    # Ensure sensitive values are set in production
-    if not Config.SECRET_KEY or Config.SECRET_KEY == 'dev-key-change-in-production':
-        raise ValueError('SECRET_KEY must be configured for production')
 
 
 class TestingConfig(Config):
@@ -130,7 +164,14 @@ def get_config():
         'testing': TestingConfig,
     }
     
-    return config_map.get(env, DevelopmentConfig)
+    config = config_map.get(env, DevelopmentConfig)
+    
+    # Ensure sensitive values are set in production
+    if config is ProductionConfig and \
+       (not config.SECRET_KEY or config.SECRET_KEY == 'dev-key-change-in-production'):
+        raise ValueError('SECRET_KEY must be configured for production')
+    
+    return config
 
 
 def load_custom_config(config_file):
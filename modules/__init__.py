@@ -4,7 +4,11 @@ Service Desk Automation System Modules
 
 from .spelling_corrector import SpellingCorrector, spelling_corrector
 from .database import TicketDatabase, ExcelReportGenerator
+from .write_queue import GroupCommitWriter
+from .ticket_cache import TicketCache
+from .change_notifier import ChangeNotifier
 from .ticket_router import TicketRouter, TicketAssignment
+from .sla_scheduler import EscalationScheduler
 from .email_integration import Office365Integration, EmailTicketParser
 
 __all__ = [
@@ -12,8 +16,12 @@ __all__ = [
     'spelling_corrector',
     'TicketDatabase',
     'ExcelReportGenerator',
+    'GroupCommitWriter',
+    'TicketCache',
+    'ChangeNotifier',
     'TicketRouter',
     'TicketAssignment',
+    'EscalationScheduler',
     'Office365Integration',
     'EmailTicketParser'
 ]
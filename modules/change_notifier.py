@@ -0,0 +1,87 @@
+"""
+Change Notifier Module
+Wakes server-sent event streams when ticket data changes
+"""
+
+import os
+import threading
+import time
+
+
+class ChangeNotifier:
+    """
+    Watches the database change sequence and wakes waiting streams
+
+    Writes made through the local TicketDatabase notify immediately via
+    its change listeners. Writes from other worker processes are picked
+    up by a background thread that reads the change sequence every
+    ``poll_interval`` seconds - one primary key lookup per process, no
+    matter how many streams are open.
+    """
+
+    def __init__(self, db, poll_interval=1.0):
+        """
+        Initialize notifier
+
+        Args:
+            db (TicketDatabase): Database to watch
+            poll_interval (float): Seconds between change sequence checks
+        """
+        self.db = db
+        self.poll_interval = max(float(poll_interval), 0.1)
+
+        self._condition = threading.Condition()
+        self._version = db.get_data_version()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        db.add_change_listener(self.notify)
+
+    @property
+    def version(self):
+        """Latest change sequence number seen"""
+        return self._version
+
+    def start(self):
+        """Start the watcher thread if it is not running in this process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            # Threads do not survive fork; start a fresh watcher per process
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='ticket-change-notifier', daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Re-read the change sequence and wake waiters if it moved"""
+        version = self.db.get_data_version()
+        with self._condition:
+            if version > self._version:
+                self._version = version
+                self._condition.notify_all()
+
+    def wait(self, since, timeout):
+        """
+        Block until the data changes after ``since`` or the timeout passes
+
+        Args:
+            since (int): Change sequence number the caller has seen
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            int: Latest change sequence number
+        """
+        self.start()
+        with self._condition:
+            self._condition.wait_for(lambda: self._version > since, timeout)
+            return self._version
+
+    def _run(self):
+        """Watcher thread main loop"""
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.notify()
+            except Exception as e:
+                print(f"Change notifier error: {str(e)}")
@@ -0,0 +1,147 @@
+"""
+Ticket Compaction Module
+Compact storage encoding for the text columns of closed tickets
+"""
+
+import difflib
+import json
+import zlib
+
+
+class TicketCodec:
+    """
+    Encode and decode the bulky text columns of a ticket row
+
+    The ``storage_flags`` bitmask records how each column is stored:
+
+    - the corrected description is dropped when it equals the original,
+      or stored as a diff against the original when that is shorter
+      (a JSON list of ``[start, end]`` copies from the original and
+      literal strings);
+    - long text and metadata are zlib-compressed into BLOBs when that
+      saves space.
+
+    A row with ``storage_flags = 0`` is stored as plain text.
+    """
+
+    CORRECTED_SAME = 1
+    CORRECTED_DIFF = 2
+    CORRECTED_ZLIB = 4
+    ORIGINAL_ZLIB = 8
+    NOTES_ZLIB = 16
+    METADATA_ZLIB = 32
+
+    # Column -> flag for columns that are compressed as a whole
+    COMPRESSED_COLUMNS = {
+        'original_description': ORIGINAL_ZLIB,
+        'resolution_notes': NOTES_ZLIB,
+        'metadata': METADATA_ZLIB,
+    }
+
+    def __init__(self, min_compress_length=200):
+        """
+        Initialize codec
+
+        Args:
+            min_compress_length (int): Shortest text (in bytes) worth compressing
+        """
+        self.min_compress_length = min_compress_length
+
+    def encode(self, ticket):
+        """
+        Encode the text columns of a plain ticket
+
+        Args:
+            ticket (dict): Ticket with plain original_description,
+                corrected_description, resolution_notes and metadata
+
+        Returns:
+            tuple: (dict of column values to store, storage_flags)
+        """
+        flags = 0
+        columns = {}
+        original = ticket.get('original_description') or ''
+        corrected = ticket.get('corrected_description')
+
+        if corrected is not None:
+            if corrected == original:
+                columns['corrected_description'] = ''
+                flags |= self.CORRECTED_SAME
+            else:
+                diff = self._diff(original, corrected)
+                compressed = self._compress(corrected)
+                smallest = len(compressed) if compressed is not None else len(corrected.encode('utf-8'))
+                if len(diff.encode('utf-8')) < smallest:
+                    columns['corrected_description'] = diff
+                    flags |= self.CORRECTED_DIFF
+                elif compressed is not None:
+                    columns['corrected_description'] = compressed
+                    flags |= self.CORRECTED_ZLIB
+
+        for column, flag in self.COMPRESSED_COLUMNS.items():
+            compressed = self._compress(ticket.get(column))
+            if compressed is not None:
+                columns[column] = compressed
+                flags |= flag
+
+        return columns, flags
+
+    def decode(self, ticket, flags):
+        """
+        Restore plain text columns in a ticket dict (in place)
+
+        Columns missing from ``ticket`` (column projections) are skipped;
+        the corrected description needs original_description to be present.
+
+        Returns:
+            dict: The same ticket
+        """
+        for column, flag in self.COMPRESSED_COLUMNS.items():
+            if flags & flag and ticket.get(column) is not None:
+                ticket[column] = self._decompress(ticket[column])
+
+        if 'corrected_description' in ticket:
+            stored = ticket['corrected_description']
+            if flags & self.CORRECTED_SAME:
+                ticket['corrected_description'] = ticket.get('original_description')
+            elif flags & self.CORRECTED_DIFF:
+                ticket['corrected_description'] = self._patch(ticket.get('original_description') or '', stored)
+            elif flags & self.CORRECTED_ZLIB:
+                ticket['corrected_description'] = self._decompress(stored)
+
+        return ticket
+
+    def _compress(self, text):
+        """Compress text when it is long enough and gets smaller, else None"""
+        if not text:
+            return None
+        data = text.encode('utf-8')
+        if len(data) < self.min_compress_length:
+            return None
+        compressed = zlib.compress(data, 9)
+        return compressed if len(compressed) < len(data) else None
+
+    @staticmethod
+    def _decompress(value):
+        """Decompress a stored BLOB back into text"""
+        return zlib.decompress(value).decode('utf-8')
+
+    @staticmethod
+    def _diff(original, corrected):
+        """Encode corrected text as copies from the original plus literals"""
+        parts = []
+        matcher = difflib.SequenceMatcher(None, original, corrected)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                parts.append([i1, i2])
+            elif j2 > j1:
+                parts.append(corrected[j1:j2])
+        return json.dumps(parts, separators=(',', ':'), ensure_ascii=False)
+
+    @staticmethod
+    def _patch(original, diff):
+        """Rebuild corrected text from the original and a stored diff"""
+        return ''.join(
+            original[part[0]:part[1]] if isinstance(part, list) else part
+            for part in json.loads(diff)
+        )
@@ -6,90 +6,1079 @@ Manages ticket storage in SQLite database and Excel files
 import sqlite3
 import json
 import os
-from datetime import datetime
+import re
+import html
+import base64
+import calendar
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 import uuid
 from pathlib import Path
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+try:
+    from .write_queue import GroupCommitWriter
+    from .ticket_cache import TicketCache
+    from .partitions import PartitionStore
+    from .compaction import TicketCodec
+except ImportError:
+    from write_queue import GroupCommitWriter
+    from ticket_cache import TicketCache
+    from partitions import PartitionStore
+    from compaction import TicketCodec
+
+
+class ConnectionPool:
+    """
+    Pool of reusable SQLite connections
+
+    A connection is checked out by the calling thread and stays bound to it
+    until the outermost ``connection()`` block exits, so nested calls on the
+    same thread (e.g. ``create_ticket`` -> ``add_history``) share one
+    connection and one transaction. Released connections are kept idle and
+    reused by later requests instead of reconnecting every time.
+    """
+
+    JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+    SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+    def __init__(self, db_path, pool_size=8, journal_mode='WAL', synchronous='NORMAL',
+                 busy_timeout=5000, cache_size_kb=16384, mmap_size=0):
+        """
+        Initialize connection pool
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            pool_size (int): Maximum number of idle connections kept open
+            journal_mode (str): SQLite journal mode (WAL recommended)
+            synchronous (str): SQLite synchronous level
+            busy_timeout (int): Milliseconds to wait on a locked database
+            cache_size_kb (int): Page cache size per connection in KiB
+            mmap_size (int): Bytes of the database file to memory-map (0 disables)
+        """
+        journal_mode = journal_mode.upper()
+        synchronous = synchronous.upper()
+        if journal_mode not in self.JOURNAL_MODES:
+            raise ValueError(f'Unsupported journal mode: {journal_mode}')
+        if synchronous not in self.SYNCHRONOUS_LEVELS:
+            raise ValueError(f'Unsupported synchronous level: {synchronous}')
+
+        self.db_path = db_path
+        self.pool_size = int(pool_size)
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.busy_timeout = int(busy_timeout)
+        self.cache_size_kb = int(cache_size_kb)
+        self.mmap_size = int(mmap_size)
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _connect(self):
+        """Open a new connection and apply pragmas"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000.0,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+        conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        conn.execute(f'PRAGMA busy_timeout = {self.busy_timeout}')
+        conn.execute(f'PRAGMA cache_size = {-self.cache_size_kb}')
+        conn.execute(f'PRAGMA mmap_size = {self.mmap_size}')
+        return conn
+
+    def _acquire(self):
+        """Take an idle connection or open a new one"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: never share the parent's file handles
+                self._idle = []
+                self._pid = os.getpid()
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _release(self, conn):
+        """Return connection to the idle list or close it"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if self._pid == os.getpid() and len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection bound to the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block inside a write transaction
+
+        Nested transactions on the same thread join the outer one; only the
+        outermost block commits or rolls back.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
 
 class TicketDatabase:
     """Manage ticket storage in SQLite database"""
     
-    def __init__(self, db_path='data/tickets/tickets.db'):
-        """Initialize database connection"""
+    # Per-day and all-time (day = '') counters recomputed from tickets
+    STATISTICS_REBUILD_SQL = '''
+        INSERT INTO statistics (day, status_code, priority_code, category_code, department, count)
+        SELECT SUBSTR(created_timestamp, 1, 10), IFNULL(status_code, 0), IFNULL(priority_code, 0),
+               IFNULL(category_code, 0), IFNULL(department, ''), COUNT(*)
+        FROM tickets GROUP BY 1, 2, 3, 4, 5
+        UNION ALL
+        SELECT '', IFNULL(status_code, 0), IFNULL(priority_code, 0),
+               IFNULL(category_code, 0), IFNULL(department, ''), COUNT(*)
+        FROM tickets GROUP BY 2, 3, 4, 5
+    '''
+    
+    # Adds the counts of another ticket table (e.g. a partition) to the counters
+    STATISTICS_ADD_SQL = '''
+        INSERT INTO statistics (day, status_code, priority_code, category_code, department, count)
+        SELECT * FROM (
+            SELECT SUBSTR(created_timestamp, 1, 10), IFNULL(status_code, 0), IFNULL(priority_code, 0),
+                   IFNULL(category_code, 0), IFNULL(department, ''), COUNT(*)
+            FROM {source} WHERE {where} GROUP BY 1, 2, 3, 4, 5
+            UNION ALL
+            SELECT '', IFNULL(status_code, 0), IFNULL(priority_code, 0),
+                   IFNULL(category_code, 0), IFNULL(department, ''), COUNT(*)
+            FROM {source} WHERE {where} GROUP BY 2, 3, 4, 5
+        ) WHERE 1
+        ON CONFLICT (day, status_code, priority_code, category_code, department)
+        DO UPDATE SET count = count + excluded.count
+    '''
+    
+    SEARCH_REBUILD_SQL = '''
+        INSERT INTO tickets_fts (rowid, ticket_id, corrected_description,
+                                 original_description, resolution_notes)
+        SELECT rowid, ticket_id, corrected_description, original_description, resolution_notes
+        FROM tickets
+    '''
+    
+    # Markers wrapped around matched terms by snippet(); replaced after escaping
+    SNIPPET_OPEN = '\x02'
+    SNIPPET_CLOSE = '\x03'
+    
+    # Versioned schema changes applied after the base tables exist.
+    # Each entry runs once, in order, and bumps PRAGMA user_version.
+    SCHEMA_MIGRATIONS = [
+        (1, 'secondary indexes for list filters and history lookups', [
+            'CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets(created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_created ON tickets(status, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_category_created ON tickets(category, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_priority_created ON tickets(priority, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_category_created '
+            'ON tickets(status, category, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_priority_created '
+            'ON tickets(status, priority, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_assigned_status ON tickets(assigned_to, status, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_history_ticket_timestamp ON ticket_history(ticket_id, timestamp)',
+        ]),
+        (2, 'normalized requester email for case-insensitive lookup', [
+            'ALTER TABLE tickets ADD COLUMN email_normalized TEXT COLLATE NOCASE',
+            'UPDATE tickets SET email_normalized = LOWER(TRIM(user_email))',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_email_created '
+            'ON tickets(email_normalized, created_timestamp, ticket_id)',
+        ]),
+        (3, 'department list index', [
+            'CREATE INDEX IF NOT EXISTS idx_tickets_department_created '
+            'ON tickets(department, created_timestamp)',
+        ]),
+        (4, 'statistics counters maintained by triggers', [
+            # Replaces the original, never-populated statistics table
+            'DROP TABLE IF EXISTS statistics',
+            '''CREATE TABLE statistics (
+                day TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority TEXT NOT NULL,
+                category TEXT NOT NULL,
+                department TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, status, priority, category, department)
+            ) WITHOUT ROWID''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_statistics_insert AFTER INSERT ON tickets
+            BEGIN
+                INSERT INTO statistics (day, status, priority, category, department, count)
+                VALUES (SUBSTR(NEW.created_timestamp, 1, 10), IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''),
+                        IFNULL(NEW.category, ''), IFNULL(NEW.department, ''), 1),
+                       ('', IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''),
+                        IFNULL(NEW.category, ''), IFNULL(NEW.department, ''), 1)
+                ON CONFLICT (day, status, priority, category, department)
+                DO UPDATE SET count = count + excluded.count;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_statistics_update
+            AFTER UPDATE OF status, priority, category, department, created_timestamp ON tickets
+            BEGIN
+                INSERT INTO statistics (day, status, priority, category, department, count)
+                VALUES (SUBSTR(OLD.created_timestamp, 1, 10), IFNULL(OLD.status, ''), IFNULL(OLD.priority, ''),
+                        IFNULL(OLD.category, ''), IFNULL(OLD.department, ''), -1),
+                       ('', IFNULL(OLD.status, ''), IFNULL(OLD.priority, ''),
+                        IFNULL(OLD.category, ''), IFNULL(OLD.department, ''), -1)
+                ON CONFLICT (day, status, priority, category, department)
+                DO UPDATE SET count = count + excluded.count;
+                INSERT INTO statistics (day, status, priority, category, department, count)
+                VALUES (SUBSTR(NEW.created_timestamp, 1, 10), IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''),
+                        IFNULL(NEW.category, ''), IFNULL(NEW.department, ''), 1),
+                       ('', IFNULL(NEW.status, ''), IFNULL(NEW.priority, ''),
+                        IFNULL(NEW.category, ''), IFNULL(NEW.department, ''), 1)
+                ON CONFLICT (day, status, priority, category, department)
+                DO UPDATE SET count = count + excluded.count;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_statistics_delete AFTER DELETE ON tickets
+            BEGIN
+                INSERT INTO statistics (day, status, priority, category, department, count)
+                VALUES (SUBSTR(OLD.created_timestamp, 1, 10), IFNULL(OLD.status, ''), IFNULL(OLD.priority, ''),
+                        IFNULL(OLD.category, ''), IFNULL(OLD.department, ''), -1),
+                       ('', IFNULL(OLD.status, ''), IFNULL(OLD.priority, ''),
+                        IFNULL(OLD.category, ''), IFNULL(OLD.department, ''), -1)
+                ON CONFLICT (day, status, priority, category, department)
+                DO UPDATE SET count = count + excluded.count;
+            END''',
+            '''INSERT INTO statistics (day, status, priority, category, department, count)
+            SELECT SUBSTR(created_timestamp, 1, 10), IFNULL(status, ''), IFNULL(priority, ''),
+                   IFNULL(category, ''), IFNULL(department, ''), COUNT(*)
+            FROM tickets GROUP BY 1, 2, 3, 4, 5
+            UNION ALL
+            SELECT '', IFNULL(status, ''), IFNULL(priority, ''),
+                   IFNULL(category, ''), IFNULL(department, ''), COUNT(*)
+            FROM tickets GROUP BY 2, 3, 4, 5''',
+        ]),
+        (5, 'full-text search index over ticket text', [
+            # Rows share rowid with tickets; rebuild_search_index() after VACUUM
+            '''CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+                ticket_id UNINDEXED,
+                corrected_description,
+                original_description,
+                resolution_notes,
+                tokenize = 'porter unicode61'
+            )''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_insert AFTER INSERT ON tickets
+            BEGIN
+                INSERT INTO tickets_fts (rowid, ticket_id, corrected_description,
+                                         original_description, resolution_notes)
+                VALUES (NEW.rowid, NEW.ticket_id, NEW.corrected_description,
+                        NEW.original_description, NEW.resolution_notes);
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_update
+            AFTER UPDATE OF corrected_description, original_description, resolution_notes ON tickets
+            BEGIN
+                UPDATE tickets_fts
+                SET corrected_description = NEW.corrected_description,
+                    original_description = NEW.original_description,
+                    resolution_notes = NEW.resolution_notes
+                WHERE rowid = NEW.rowid;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_delete AFTER DELETE ON tickets
+            BEGIN
+                DELETE FROM tickets_fts WHERE rowid = OLD.rowid;
+            END''',
+            SEARCH_REBUILD_SQL,
+        ]),
+        (6, 'integer epoch timestamps for indexable date ranges', [
+            # Existing rows are filled in batches by backfill_epochs()
+            'ALTER TABLE tickets ADD COLUMN created_epoch INTEGER',
+            'ALTER TABLE tickets ADD COLUMN updated_epoch INTEGER',
+            'ALTER TABLE tickets ADD COLUMN resolved_epoch INTEGER',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_created_epoch ON tickets(created_epoch)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_updated_epoch ON tickets(updated_epoch)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_resolved_epoch ON tickets(resolved_epoch)',
+        ]),
+        (7, 'change sequence for cross-process cache coherence', [
+            # AUTOINCREMENT keeps seq monotonic even after old rows are pruned
+            '''CREATE TABLE IF NOT EXISTS ticket_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticket_id TEXT NOT NULL,
+                change_type TEXT NOT NULL,
+                changed_at TEXT NOT NULL DEFAULT (STRFTIME('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+            )''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_insert AFTER INSERT ON tickets
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (NEW.ticket_id, 'created');
+            END''',
+            # Storage-only columns (epochs, email_normalized) are not changes
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_update
+            AFTER UPDATE OF ticket_id, user_name, user_email, department, phone, asset_id,
+                            original_description, corrected_description, category, priority,
+                            status, assigned_to, created_timestamp, updated_timestamp,
+                            resolved_timestamp, resolution_notes, attachments, metadata ON tickets
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (NEW.ticket_id, 'updated');
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_delete AFTER DELETE ON tickets
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (OLD.ticket_id, 'deleted');
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_history AFTER INSERT ON ticket_history
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (NEW.ticket_id, 'history');
+            END''',
+        ]),
+        (8, 'compact storage encoding for closed tickets', [
+            # Non-zero flags mark encoded text columns (see TicketCodec)
+            'ALTER TABLE tickets ADD COLUMN storage_flags INTEGER NOT NULL DEFAULT 0',
+            # Re-encoding text is not an edit: keep the search index on the
+            # plain text and leave the change log alone when flags change
+            'DROP TRIGGER IF EXISTS trg_tickets_fts_update',
+            '''CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_update
+            AFTER UPDATE OF corrected_description, original_description, resolution_notes ON tickets
+            WHEN NEW.storage_flags = OLD.storage_flags
+            BEGIN
+                UPDATE tickets_fts
+                SET corrected_description = NEW.corrected_description,
+                    original_description = NEW.original_description,
+                    resolution_notes = NEW.resolution_notes
+                WHERE rowid = NEW.rowid;
+            END''',
+            'DROP TRIGGER IF EXISTS trg_ticket_changes_update',
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_update
+            AFTER UPDATE OF ticket_id, user_name, user_email, department, phone, asset_id,
+                            original_description, corrected_description, category, priority,
+                            status, assigned_to, created_timestamp, updated_timestamp,
+                            resolved_timestamp, resolution_notes, attachments, metadata ON tickets
+            WHEN NEW.storage_flags = OLD.storage_flags
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (NEW.ticket_id, 'updated');
+            END''',
+        ]),
+        (9, 'integer codes for status, priority and category', [
+            # Names live once in small lookup tables; tickets, indexes and
+            # counters store the integer code (see LABEL_COLUMNS)
+            'CREATE TABLE IF NOT EXISTS ticket_statuses (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)',
+            'CREATE TABLE IF NOT EXISTS ticket_priorities (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)',
+            'CREATE TABLE IF NOT EXISTS ticket_categories (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)',
+            "INSERT OR IGNORE INTO ticket_statuses (name) "
+            "VALUES ('Open'), ('Assigned'), ('In Progress'), ('Resolved'), ('Closed')",
+            "INSERT OR IGNORE INTO ticket_priorities (name) "
+            "VALUES ('P1 - Critical'), ('P2 - High'), ('P3 - Medium'), ('P4 - Low')",
+            "INSERT OR IGNORE INTO ticket_categories (name) VALUES ('General')",
+            'INSERT OR IGNORE INTO ticket_statuses (name) '
+            'SELECT DISTINCT status FROM tickets WHERE status IS NOT NULL ORDER BY status',
+            'INSERT OR IGNORE INTO ticket_priorities (name) '
+            'SELECT DISTINCT priority FROM tickets WHERE priority IS NOT NULL ORDER BY priority',
+            'INSERT OR IGNORE INTO ticket_categories (name) '
+            'SELECT DISTINCT category FROM tickets WHERE category IS NOT NULL ORDER BY category',
+            # Everything that references the text columns goes before they do
+            'DROP TRIGGER IF EXISTS trg_statistics_insert',
+            'DROP TRIGGER IF EXISTS trg_statistics_update',
+            'DROP TRIGGER IF EXISTS trg_statistics_delete',
+            'DROP TRIGGER IF EXISTS trg_ticket_changes_update',
+            'DROP INDEX IF EXISTS idx_tickets_status_created',
+            'DROP INDEX IF EXISTS idx_tickets_category_created',
+            'DROP INDEX IF EXISTS idx_tickets_priority_created',
+            'DROP INDEX IF EXISTS idx_tickets_status_category_created',
+            'DROP INDEX IF EXISTS idx_tickets_status_priority_created',
+            'DROP INDEX IF EXISTS idx_tickets_assigned_status',
+            'ALTER TABLE tickets ADD COLUMN status_code INTEGER',
+            'ALTER TABLE tickets ADD COLUMN priority_code INTEGER',
+            'ALTER TABLE tickets ADD COLUMN category_code INTEGER',
+            '''UPDATE tickets SET
+                status_code = (SELECT code FROM ticket_statuses WHERE name = tickets.status),
+                priority_code = (SELECT code FROM ticket_priorities WHERE name = tickets.priority),
+                category_code = (SELECT code FROM ticket_categories WHERE name = tickets.category)''',
+            'ALTER TABLE tickets DROP COLUMN status',
+            'ALTER TABLE tickets DROP COLUMN priority',
+            'ALTER TABLE tickets DROP COLUMN category',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_created ON tickets(status_code, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_category_created ON tickets(category_code, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_priority_created ON tickets(priority_code, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_category_created '
+            'ON tickets(status_code, category_code, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_status_priority_created '
+            'ON tickets(status_code, priority_code, created_timestamp)',
+            'CREATE INDEX IF NOT EXISTS idx_tickets_assigned_status '
+            'ON tickets(assigned_to, status_code, created_timestamp)',
+            # Counters are keyed by code too (0 where the ticket has none)
+            'DROP TABLE IF EXISTS statistics',
+            '''CREATE TABLE statistics (
+                day TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                priority_code INTEGER NOT NULL,
+                category_code INTEGER NOT NULL,
+                department TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, status_code, priority_code, category_code, department)
+            ) WITHOUT ROWID''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_statistics_insert AFTER INSERT ON tickets
+            BEGIN
+                INSERT INTO statistics (day, status_code, priority_code, category_code, department, count)
+                VALUES (SUBSTR(NEW.created_timestamp, 1, 10), IFNULL(NEW.status_code, 0),
+                        IFNULL(NEW.priority_code, 0), IFNULL(NEW.category_code, 0),
+                        IFNULL(NEW.department, ''), 1),
+                       ('', IFNULL(NEW.status_code, 0), IFNULL(NEW.priority_code, 0),
+                        IFNULL(NEW.category_code, 0), IFNULL(NEW.department, ''), 1)
+                ON CONFLICT (day, status_code, priority_code, category_code, department)
+                DO UPDATE SET count = count + excluded.count;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_statistics_update
+            AFTER UPDATE OF status_code, priority_code, category_code, department, created_timestamp ON tickets
+            BEGIN
+                INSERT INTO statistics (day, status_code, priority_code, category_code, department, count)
+                VALUES (SUBSTR(OLD.created_timestamp, 1, 10), IFNULL(OLD.status_code, 0),
+                        IFNULL(OLD.priority_code, 0), IFNULL(OLD.category_code, 0),
+                        IFNULL(OLD.department, ''), -1),
+                       ('', IFNULL(OLD.status_code, 0), IFNULL(OLD.priority_code, 0),
+                        IFNULL(OLD.category_code, 0), IFNULL(OLD.department, ''), -1)
+                ON CONFLICT (day, status_code, priority_code, category_code, department)
+                DO UPDATE SET count = count + excluded.count;
+                INSERT INTO statistics (day, status_code, priority_code, category_code, department, count)
+                VALUES (SUBSTR(NEW.created_timestamp, 1, 10), IFNULL(NEW.status_code, 0),
+                        IFNULL(NEW.priority_code, 0), IFNULL(NEW.category_code, 0),
+                        IFNULL(NEW.department, ''), 1),
+                       ('', IFNULL(NEW.status_code, 0), IFNULL(NEW.priority_code, 0),
+                        IFNULL(NEW.category_code, 0), IFNULL(NEW.department, ''), 1)
+                ON CONFLICT (day, status_code, priority_code, category_code, department)
+                DO UPDATE SET count = count + excluded.count;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS trg_statistics_delete AFTER DELETE ON tickets
+            BEGIN
+                INSERT INTO statistics (day, status_code, priority_code, category_code, department, count)
+                VALUES (SUBSTR(OLD.created_timestamp, 1, 10), IFNULL(OLD.status_code, 0),
+                        IFNULL(OLD.priority_code, 0), IFNULL(OLD.category_code, 0),
+                        IFNULL(OLD.department, ''), -1),
+                       ('', IFNULL(OLD.status_code, 0), IFNULL(OLD.priority_code, 0),
+                        IFNULL(OLD.category_code, 0), IFNULL(OLD.department, ''), -1)
+                ON CONFLICT (day, status_code, priority_code, category_code, department)
+                DO UPDATE SET count = count + excluded.count;
+            END''',
+            STATISTICS_REBUILD_SQL,
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_update
+            AFTER UPDATE OF ticket_id, user_name, user_email, department, phone, asset_id,
+                            original_description, corrected_description, category_code, priority_code,
+                            status_code, assigned_to, created_timestamp, updated_timestamp,
+                            resolved_timestamp, resolution_notes, attachments, metadata ON tickets
+            WHEN NEW.storage_flags = OLD.storage_flags
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (NEW.ticket_id, 'updated');
+            END''',
+        ]),
+        (10, 'row version for conditional updates', [
+            # Bumped by every update; clients send it back in If-Match
+            'ALTER TABLE tickets ADD COLUMN version INTEGER NOT NULL DEFAULT 1',
+        ]),
+        (11, 'team work queue with claim leases', [
+            'ALTER TABLE tickets ADD COLUMN assigned_team TEXT',
+            'ALTER TABLE tickets ADD COLUMN claim_expires_epoch INTEGER',
+            # Only unclaimed tickets are indexed; claim_next_ticket() reads
+            # the first entry of a team's range
+            'CREATE INDEX IF NOT EXISTS idx_tickets_queue '
+            "ON tickets(assigned_team, priority_code, created_timestamp) WHERE assigned_to = 'Unassigned'",
+            'CREATE INDEX IF NOT EXISTS idx_tickets_claim_expires '
+            'ON tickets(claim_expires_epoch) WHERE claim_expires_epoch IS NOT NULL',
+            'DROP TRIGGER IF EXISTS trg_ticket_changes_update',
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_update
+            AFTER UPDATE OF ticket_id, user_name, user_email, department, phone, asset_id,
+                            original_description, corrected_description, category_code, priority_code,
+                            status_code, assigned_to, created_timestamp, updated_timestamp,
+                            resolved_timestamp, resolution_notes, attachments, metadata,
+                            assigned_team ON tickets
+            WHEN NEW.storage_flags = OLD.storage_flags
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (NEW.ticket_id, 'updated');
+            END''',
+        ]),
+        (12, 'SLA escalation tracking', [
+            'ALTER TABLE tickets ADD COLUMN escalation_level INTEGER NOT NULL DEFAULT 0',
+            'ALTER TABLE tickets ADD COLUMN escalated_timestamp TEXT',
+            'ALTER TABLE tickets ADD COLUMN escalated_epoch INTEGER',
+            'DROP TRIGGER IF EXISTS trg_ticket_changes_update',
+            '''CREATE TRIGGER IF NOT EXISTS trg_ticket_changes_update
+            AFTER UPDATE OF ticket_id, user_name, user_email, department, phone, asset_id,
+                            original_description, corrected_description, category_code, priority_code,
+                            status_code, assigned_to, created_timestamp, updated_timestamp,
+                            resolved_timestamp, resolution_notes, attachments, metadata,
+                            assigned_team, escalation_level, escalated_timestamp ON tickets
+            WHEN NEW.storage_flags = OLD.storage_flags
+            BEGIN
+                INSERT INTO ticket_changes (ticket_id, change_type) VALUES (NEW.ticket_id, 'updated');
+            END''',
+        ]),
+    ]
+    
+    # Filters that can be answered from the statistics counters
+    STATISTICS_FILTERS = ('status', 'category', 'priority', 'department', 'date_from', 'date_to')
+    
+    # Storage-only columns stripped from ticket dicts returned to callers
+    INTERNAL_COLUMNS = ('email_normalized', 'created_epoch', 'updated_epoch', 'resolved_epoch',
+                        'storage_flags', 'claim_expires_epoch', 'escalated_epoch')
+    
+    # Public columns stored as integer codes: column -> (code column, lookup table)
+    LABEL_COLUMNS = {
+        'status': ('status_code', 'ticket_statuses'),
+        'priority': ('priority_code', 'ticket_priorities'),
+        'category': ('category_code', 'ticket_categories'),
+    }
+    
+    # Seconds before code -> name lookups are re-read (renames in other processes)
+    LABEL_CACHE_SECONDS = 60
+    
+    # Columns compact_tickets() may encode
+    COMPACT_COLUMNS = ('original_description', 'corrected_description', 'resolution_notes', 'metadata')
+    
+    # Public ticket columns, in table order
+    TICKET_FIELDS = (
+        'ticket_id', 'user_name', 'user_email', 'department', 'phone', 'asset_id',
+        'original_description', 'corrected_description', 'category', 'priority',
+        'status', 'assigned_to', 'created_timestamp', 'updated_timestamp',
+        'resolved_timestamp', 'resolution_notes', 'attachments', 'metadata', 'version',
+        'assigned_team', 'escalation_level', 'escalated_timestamp',
+    )
+    
+    # Named column projections for list views
+    FIELD_SETS = {
+        'summary': (
+            'ticket_id', 'user_name', 'user_email', 'department', 'category', 'priority',
+            'status', 'assigned_to', 'created_timestamp', 'updated_timestamp', 'version',
+        ),
+        'full': TICKET_FIELDS,
+    }
+    
+    # ISO timestamp columns and their integer epoch shadows
+    EPOCH_COLUMNS = {
+        'created_timestamp': 'created_epoch',
+        'updated_timestamp': 'updated_epoch',
+        'resolved_timestamp': 'resolved_epoch',
+        'escalated_timestamp': 'escalated_epoch',
+    }
+    
+    HISTORY_QUERY = '''
+        SELECT * FROM ticket_history WHERE ticket_id = ?
+        ORDER BY timestamp DESC
+    '''
+    
+    # ALTER TABLE ... DROP COLUMN (migration 9) and UPDATE ... RETURNING
+    MIN_SQLITE_VERSION = (3, 35, 0)
+    
+    # Representative list filters whose plans must stay index-backed
+    QUERY_PLAN_CHECKS = [
+        {'status': 'Open'},
+        {'category': 'Network'},
+        {'priority': 'P1 - Critical'},
+        {'status': 'Open', 'category': 'Network'},
+        {'status': 'Open', 'priority': 'P1 - Critical'},
+        {'assigned_to': 'tech1'},
+        {'assigned_to': 'tech1', 'status': 'Assigned'},
+        {'department': 'IT'},
+        {'date_from': '2024-01-01', 'date_to': '2024-01-31'},
+    ]
+    
+    def __init__(self, db_path='data/tickets/tickets.db', pool_size=8, journal_mode='WAL',
+                 synchronous='NORMAL', busy_timeout=5000, cache_size_kb=16384, mmap_size=0,
+                 group_commit=False, group_commit_delay_ms=2, group_commit_max_batch=256,
+                 ticket_cache_size=1024, partition_dir=None, check_plans=False):
+        """
+        Initialize database connection pool
+        
+        With ``group_commit`` enabled every write goes through a single
+        writer thread that commits concurrent writes together (see
+        GroupCommitWriter). ``ticket_cache_size`` bounds the LRU cache of
+        ticket detail records (0 disables it). With ``partition_dir`` set,
+        archive_tickets() moves old closed tickets into monthly partition
+        files there and reads fan out to them. With ``check_plans`` the
+        hot query plans are verified at startup (see check_query_plans),
+        so a lost index fails loudly instead of degrading to table scans.
+        """
+        if sqlite3.sqlite_version_info < self.MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, self.MIN_SQLITE_VERSION))} or newer is required "
+                f"(Python's sqlite3 module uses {sqlite3.sqlite_version})"
+            )
         self.db_path = db_path
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.conn = None
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.pool = ConnectionPool(
+            db_path,
+            pool_size=pool_size,
+            journal_mode=journal_mode,
+            synchronous=synchronous,
+            busy_timeout=busy_timeout,
+            cache_size_kb=cache_size_kb,
+            mmap_size=mmap_size
+        )
         self.initialize_database()
+        self._load_labels()
+        
+        # Date filters use the epoch columns once every row has them
+        self.epochs_ready = not self._has_missing_epochs()
+        if not self.epochs_ready:
+            threading.Thread(target=self.backfill_epochs, name='ticket-epoch-backfill', daemon=True).start()
+        
+        self.writer = None
+        if group_commit:
+            self.writer = GroupCommitWriter(
+                self.pool,
+                max_delay_ms=group_commit_delay_ms,
+                max_batch=group_commit_max_batch
+            )
+        
+        self.ticket_cache = TicketCache(ticket_cache_size)
+        self._change_listeners = []
+        self._cache_sync_lock = threading.Lock()
+        self._cache_seen_version = self.get_data_version()
+        
+        self.partitions = PartitionStore(partition_dir) if partition_dir else None
+        if self.partitions is not None:
+            self._upgrade_partitions()
+        
+        self.codec = TicketCodec()
+        
+        if check_plans:
+            self.check_query_plans()
+    
+    @classmethod
+    def from_config(cls, config):
+        """Create database using settings from a Config class"""
+        return cls(
+            config.DATABASE_PATH,
+            pool_size=config.SQLITE_POOL_SIZE,
+            journal_mode=config.SQLITE_JOURNAL_MODE,
+            synchronous=config.SQLITE_SYNCHRONOUS,
+            busy_timeout=config.SQLITE_BUSY_TIMEOUT_MS,
+            cache_size_kb=config.SQLITE_CACHE_SIZE_KB,
+            mmap_size=config.SQLITE_MMAP_SIZE,
+            group_commit=config.SQLITE_GROUP_COMMIT,
+            group_commit_delay_ms=config.SQLITE_GROUP_COMMIT_DELAY_MS,
+            group_commit_max_batch=config.SQLITE_GROUP_COMMIT_MAX_BATCH,
+            ticket_cache_size=config.TICKET_CACHE_SIZE,
+            partition_dir=config.TICKET_PARTITION_DIR if config.TICKET_PARTITIONING else None,
+            check_plans=config.SQLITE_CHECK_QUERY_PLANS or config.DEBUG
+        )
+    
+    def close(self):
+        """Stop the writer and close pooled connections"""
+        if self.writer is not None:
+            self.writer.stop()
+        self.pool.close_all()
+    
+    def _write(self, operation):
+        """
+        Run a write operation and return its result
+        
+        Args:
+            operation (callable): Function called as operation(conn) inside
+                a write transaction
+        """
+        if self.writer is not None:
+            result = self.writer.execute(operation)
+        else:
+            with self.pool.transaction() as conn:
+                result = operation(conn)
+        
+        for listener in self._change_listeners:
+            listener()
+        return result
+    
+    def add_change_listener(self, callback):
+        """Call ``callback()`` after each committed write from this process"""
+        self._change_listeners.append(callback)
+    
+    def get_write_metrics(self):
+        """Get group commit metrics, or None when writes are not queued"""
+        if self.writer is None:
+            return None
+        return self.writer.get_metrics()
+    
+    def get_cache_metrics(self):
+        """Get ticket cache hit/miss/eviction counters"""
+        metrics = self.ticket_cache.get_metrics()
+        metrics['data_version'] = self._cache_seen_version
+        return metrics
+    
+    def get_data_version(self, conn=None):
+        """
+        Get the database change sequence
+        
+        Every committed change to a ticket or its history, from any
+        process, advances this number. Caches can store the version they
+        were filled at and compare before serving.
+        """
+        if conn is None:
+            with self.pool.connection() as conn:
+                return self.get_data_version(conn)
+        row = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'ticket_changes'"
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def _sync_ticket_cache(self, conn):
+        """
+        Drop cached records changed since the last check
+        
+        Writes from other worker processes do not go through this
+        instance, so before serving from the cache the ticket IDs logged
+        in ticket_changes since the last seen sequence are invalidated.
+        When nothing changed this costs one primary key lookup.
+        """
+        with self._cache_sync_lock:
+            seen = self._cache_seen_version
+            version = self.get_data_version(conn)
+            if version == seen:
+                return
+            
+            limit = self.ticket_cache.max_size
+            rows = conn.execute(
+                'SELECT ticket_id, change_type FROM ticket_changes WHERE seq > ? ORDER BY seq LIMIT ?',
+                (seen, limit + 1)
+            ).fetchall()
+            relabeled = any(row['change_type'] == 'relabeled' for row in rows)
+            if relabeled:
+                self._load_labels(conn)
+            if relabeled or len(rows) > limit:
+                # A rename touches every cached record with that label, and
+                # more changes than records held are cheaper to start over
+                self.ticket_cache.clear()
+            else:
+                for ticket_id in {row['ticket_id'] for row in rows}:
+                    self.ticket_cache.invalidate(ticket_id)
+            self._cache_seen_version = version
     
     def initialize_database(self):
         """Create necessary tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Tickets table (include asset_id for system/asset tracking)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tickets (
-                ticket_id TEXT PRIMARY KEY,
-                user_name TEXT NOT NULL,
-                user_email TEXT NOT NULL,
-                department TEXT,
-                phone TEXT,
-                asset_id TEXT,
-                original_description TEXT NOT NULL,
-                corrected_description TEXT NOT NULL,
-                category TEXT NOT NULL,
-                priority TEXT NOT NULL,
-                status TEXT DEFAULT 'Open',
-                assigned_to TEXT,
-                created_timestamp TEXT NOT NULL,
-                updated_timestamp TEXT NOT NULL,
-                resolved_timestamp TEXT,
-                resolution_notes TEXT,
-                attachments TEXT,
-                metadata TEXT
-            )
-        ''')
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Tickets table (include asset_id for system/asset tracking)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS tickets (
+                    ticket_id TEXT PRIMARY KEY,
+                    user_name TEXT NOT NULL,
+                    user_email TEXT NOT NULL,
+                    department TEXT,
+                    phone TEXT,
+                    asset_id TEXT,
+                    original_description TEXT NOT NULL,
+                    corrected_description TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    status TEXT DEFAULT 'Open',
+                    assigned_to TEXT,
+                    created_timestamp TEXT NOT NULL,
+                    updated_timestamp TEXT NOT NULL,
+                    resolved_timestamp TEXT,
+                    resolution_notes TEXT,
+                    attachments TEXT,
+                    metadata TEXT
+                )
+            ''')
+            
+            # Ticket history/audit table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ticket_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ticket_id TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    performed_by TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    details TEXT,
+                    FOREIGN KEY(ticket_id) REFERENCES tickets(ticket_id)
+                )
+            ''')
+            
+            # Ensure legacy DBs get asset_id column
+            cursor.execute("PRAGMA table_info(tickets)")
+            cols = [r[1] for r in cursor.fetchall()]
+            if 'asset_id' not in cols:
+                try:
+                    cursor.execute('ALTER TABLE tickets ADD COLUMN asset_id TEXT')
+                except Exception:
+                    pass
+            
+            self._apply_migrations(conn)
+    
+    def _apply_migrations(self, conn):
+        """Run schema migrations newer than the stored user_version"""
+        current = conn.execute('PRAGMA user_version').fetchone()[0]
+        for version, _description, statements in self.SCHEMA_MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+    
+    def _upgrade_partitions(self):
+        """Bring partitions archived under older schema versions up to date"""
+        with self.pool.connection() as conn:
+            for month in self.partitions.months():
+                with self.partitions.attach(conn, month, readonly=False) as schema:
+                    with self.pool.transaction():
+                        self.partitions.ensure_schema(conn, schema)
+                        self._encode_partition_labels(conn, schema)
+    
+    def _encode_partition_labels(self, conn, schema):
+        """
+        Fill the code columns of a partition archived with text labels
         
-        # Ticket history/audit table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ticket_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ticket_id TEXT NOT NULL,
-                action TEXT NOT NULL,
-                performed_by TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                details TEXT,
-                FOREIGN KEY(ticket_id) REFERENCES tickets(ticket_id)
-            )
-        ''')
-        
-        # Statistics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS statistics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                total_tickets INTEGER,
-                resolved_tickets INTEGER,
-                open_tickets INTEGER,
-                high_priority INTEGER,
-                category TEXT
-            )
-        ''')
+        Statistics were rebuilt from the live table when the codes were
+        introduced, so the partition's tickets are counted again here.
+        """
+        existing = {row['name'] for row in conn.execute(f'PRAGMA {schema}.table_info(tickets)')}
+        if not all(column in existing for column in self.LABEL_COLUMNS):
+            return
+        for column, (_code_column, table) in self.LABEL_COLUMNS.items():
+            conn.execute(f'INSERT OR IGNORE INTO main.{table} (name) '
+                         f'SELECT DISTINCT {column} FROM {schema}.tickets WHERE {column} IS NOT NULL')
+        assignments = ', '.join(
+            f'{code_column} = (SELECT code FROM main.{table} WHERE name = tickets.{column})'
+            for column, (code_column, table) in self.LABEL_COLUMNS.items()
+        )
+        pending = ' AND '.join(f'{code_column} IS NULL' for code_column, _table in self.LABEL_COLUMNS.values())
+        if conn.execute(f'UPDATE {schema}.tickets SET {assignments} WHERE {pending}').rowcount:
+            conn.execute(self.STATISTICS_ADD_SQL.format(source=f'{schema}.tickets', where='1=1'))
+        self._load_labels(conn)
+    
+    def _load_labels(self, conn=None):
+        """Read the status/priority/category lookup tables into memory"""
+        if conn is None:
+            with self.pool.connection() as conn:
+                return self._load_labels(conn)
+        labels = {}
+        for column, (_code_column, table) in self.LABEL_COLUMNS.items():
+            names = {row['code']: row['name'] for row in conn.execute(f'SELECT code, name FROM {table}')}
+            labels[column] = ({name: code for code, name in names.items()}, names)
+        self._labels = labels
+        self._labels_loaded_at = time.monotonic()
+    
+    def _encode_label(self, column, name, create=False):
+        """
+        Get the code stored for a status, priority or category name
+        
+        Args:
+            column (str): 'status', 'priority' or 'category'
+            name (str): Name to look up
+            create (bool): Add a name not seen before to the lookup table
+                (in its own transaction; call before the write that uses it)
+            
+        Returns:
+            int: Code, or None for a None or unknown name
+        """
+        if name is None:
+            return None
+        code = self._labels[column][0].get(name)
+        if code is None:
+            # Possibly added by another process since the last load
+            self._load_labels()
+            code = self._labels[column][0].get(name)
+        if code is None and create:
+            with self.pool.transaction() as conn:
+                conn.execute(f'INSERT OR IGNORE INTO {self.LABEL_COLUMNS[column][1]} (name) VALUES (?)', (name,))
+                self._load_labels(conn)
+            code = self._labels[column][0].get(name)
+        return code
+    
+    def _decode_label(self, column, code):
+        """Get the name for a stored status, priority or category code"""
+        if code is None:
+            return None
+        if time.monotonic() - self._labels_loaded_at > self.LABEL_CACHE_SECONDS:
+            self._load_labels()
+        name = self._labels[column][1].get(code)
+        if name is None:
+            self._load_labels()
+            name = self._labels[column][1].get(code)
+        return name
+    
+    def rename_label(self, column, old_name, new_name):
+        """
+        Rename a status, priority or category on every ticket
+        
+        Tickets store the code, so this updates one lookup row. A single
+        'relabeled' marker in the change log tells every process to
+        reload its labels and drop cached tickets, and makes change feed
+        clients reload their view (see get_changes).
+        
+        Returns:
+            int: Number of live tickets affected
+            
+        Raises:
+            ValueError: If the column or old name is unknown, or the new
+                name is already in use
+        """
+        if column not in self.LABEL_COLUMNS:
+            raise ValueError(f'Unknown label column: {column}')
+        code_column, table = self.LABEL_COLUMNS[column]
         
-        # Ensure legacy DBs get asset_id column
-        conn.commit()
-        cursor.execute("PRAGMA table_info(tickets)")
-        cols = [r[1] for r in cursor.fetchall()]
-        if 'asset_id' not in cols:
+        def rename(conn):
             try:
-                cursor.execute('ALTER TABLE tickets ADD COLUMN asset_id TEXT')
-            except Exception:
-                pass
-        conn.commit()
-        conn.close()
+                cursor = conn.execute(f'UPDATE {table} SET name = ? WHERE name = ?', (new_name, old_name))
+            except sqlite3.IntegrityError:
+                raise ValueError(f'{column.capitalize()} {new_name!r} already exists')
+            if cursor.rowcount == 0:
+                raise ValueError(f'Unknown {column}: {old_name}')
+            # The marker is not about one ticket; readers key on change_type
+            conn.execute("INSERT INTO ticket_changes (ticket_id, change_type) VALUES ('', 'relabeled')")
+            return conn.execute(
+                f'SELECT COUNT(*) FROM tickets WHERE {code_column} = (SELECT code FROM {table} WHERE name = ?)',
+                (new_name,)
+            ).fetchone()[0]
+        
+        try:
+            return self._write(rename)
+        finally:
+            self._load_labels()
+            self.ticket_cache.clear()
+    
+    @staticmethod
+    def to_epoch(timestamp):
+        """
+        Convert a stored ISO timestamp to integer epoch seconds
+        
+        Timestamps are stored as naive local wall-clock times, so they are
+        converted as if they were UTC. This matches SQLite's
+        strftime('%s', ...) used by the backfill.
+        """
+        if not timestamp:
+            return None
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        return calendar.timegm(timestamp.timetuple())
+    
+    def _has_missing_epochs(self):
+        """Check whether any ticket still lacks its epoch columns"""
+        with self.pool.connection() as conn:
+            return conn.execute(
+                'SELECT 1 FROM tickets WHERE created_epoch IS NULL LIMIT 1'
+            ).fetchone() is not None
+    
+    def backfill_epochs(self, batch_size=5000):
+        """
+        Fill epoch columns for tickets written before they existed
+        
+        Works in short batches so the database stays available to
+        other requests while it runs.
+        
+        Args:
+            batch_size (int): Tickets updated per transaction
+            
+        Returns:
+            int: Number of tickets backfilled
+        """
+        total = 0
+        while True:
+            with self.pool.transaction() as conn:
+                cursor = conn.execute('''
+                    UPDATE tickets SET
+                        created_epoch = CAST(strftime('%s', created_timestamp) AS INTEGER),
+                        updated_epoch = CAST(strftime('%s', updated_timestamp) AS INTEGER),
+                        resolved_epoch = CAST(strftime('%s', resolved_timestamp) AS INTEGER)
+                    WHERE rowid IN (
+                        SELECT rowid FROM tickets WHERE created_epoch IS NULL LIMIT ?
+                    )
+                ''', (int(batch_size),))
+            if cursor.rowcount <= 0:
+                break
+            total += cursor.rowcount
+        
+        self.epochs_ready = True
+        return total
+    
+    def get_schema_version(self):
+        """Get the applied schema migration version"""
+        with self.pool.connection() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    def check_query_plans(self):
+        """
+        Verify hot query shapes are served by indexes
+        
+        Runs EXPLAIN QUERY PLAN on the real list and history queries and
+        raises if any of them walks a whole table. Every checked shape
+        filters, so a scan is a regression even when it follows an index
+        (e.g. the created_timestamp order index after a filter index was
+        lost).
+        
+        Returns:
+            dict: Query plan details keyed by query description
+            
+        Raises:
+            RuntimeError: If a query plan contains a full table scan
+        """
+        shapes = []
+        for filters in self.QUERY_PLAN_CHECKS:
+            query, params = self._build_ticket_query(filters, limit=25)
+            shapes.append((f'tickets {sorted(filters)}', query, params))
+        shapes.append(('ticket_history by ticket_id', self.HISTORY_QUERY, ['TKT-00000000-000000']))
+        query, params = self._build_email_query('user@company.com', 10, None)
+        shapes.append(('tickets by email', query, params))
+        
+        plans = {}
+        failures = []
+        with self.pool.connection() as conn:
+            for name, query, params in shapes:
+                rows = conn.execute(f'EXPLAIN QUERY PLAN {query}', params).fetchall()
+                details = [row[3] for row in rows]
+                plans[name] = details
+                for detail in details:
+                    parts = detail.split()
+                    if parts[:1] == ['SCAN'] and parts[1:2] in (['tickets'], ['ticket_history']):
+                        failures.append(f'{name}: {detail}')
+        
+        if failures:
+            raise RuntimeError('Full table scan in query plan: ' + '; '.join(failures))
+        return plans
+    
+    INSERT_TICKET_SQL = '''
+        INSERT INTO tickets (
+            ticket_id, user_name, user_email, email_normalized, department, phone, asset_id,
+            original_description, corrected_description,
+            category_code, priority_code, status_code, assigned_to, assigned_team,
+            created_timestamp, updated_timestamp, created_epoch, updated_epoch, metadata
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    INSERT_HISTORY_SQL = '''
+        INSERT INTO ticket_history (ticket_id, action, performed_by, timestamp, details)
+        VALUES (?, ?, ?, ?, ?)
+    '''
     
     def create_ticket(self, ticket_data):
         """
@@ -101,153 +1090,1159 @@ class TicketDatabase:
         Returns:
             str: Ticket ID
         """
-        ticket_id = f"TKT-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+        return self.create_tickets([ticket_data])[0]
+    
+    def create_assigned_ticket(self, ticket_data):
+        """
+        Create a ticket that is already assigned
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        The ticket is stored with status 'Assigned' and both its 'Created'
+        and 'Assigned' history entries in one transaction, so it is never
+        visible as an unassigned 'Open' ticket.
         
-        now = datetime.now().isoformat()
+        Args:
+            ticket_data (dict): Ticket information including assigned_to
+            
+        Returns:
+            str: Ticket ID
+        """
+        return self.create_tickets([ticket_data], assign=True)[0]
+    
+    def create_tickets(self, batch, assign=False):
+        """
+        Create several tickets in one transaction
+        
+        Ticket and history rows are written with executemany, so the whole
+        batch costs a single commit.
         
-        cursor.execute('''
-            INSERT INTO tickets (
-                ticket_id, user_name, user_email, department, phone, asset_id,
-                original_description, corrected_description,
-                category, priority, status, assigned_to,
-                created_timestamp, updated_timestamp, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        Args:
+            batch (list): Ticket information dicts; one with a ticket_id
+                (see generate_ticket_id) is stored under that ID
+            assign (bool): Store tickets that have an assigned_to as 'Assigned'
+            
+        Returns:
+            list: Ticket IDs in the same order as the batch
+        """
+        if not batch:
+            return []
+        
+        now = datetime.now().isoformat()
+        ticket_ids = [ticket_data.get('ticket_id') or self.generate_ticket_id() for ticket_data in batch]
+        
+        ticket_rows = []
+        history_rows = []
+        for ticket_id, ticket_data in zip(ticket_ids, batch):
+            assigned_to = ticket_data.get('assigned_to', 'Unassigned')
+            status = 'Assigned' if assign and assigned_to != 'Unassigned' else 'Open'
+            ticket_rows.append(self._ticket_row(ticket_id, ticket_data, status, now))
+            history_rows.append((ticket_id, 'Created', 'System', now, 'Ticket created'))
+            if status == 'Assigned':
+                history_rows.append((ticket_id, 'Assigned', 'System', now, f'Assigned to {assigned_to}'))
+        
+        def insert(conn):
+            conn.executemany(self.INSERT_TICKET_SQL, ticket_rows)
+            conn.executemany(self.INSERT_HISTORY_SQL, history_rows)
+        
+        self._write(insert)
+        return ticket_ids
+    
+    @staticmethod
+    def generate_ticket_id():
+        """Generate a new TKT-YYYYMMDD-XXXXXX ticket ID"""
+        return f"TKT-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+    
+    def _ticket_row(self, ticket_id, ticket_data, status, now):
+        """Build the INSERT_TICKET_SQL parameters for one ticket"""
+        return (
             ticket_id,
             ticket_data.get('user_name', ''),
             ticket_data.get('user_email', ''),
+            self.normalize_email(ticket_data.get('user_email', '')),
             ticket_data.get('department', ''),
             ticket_data.get('phone', ''),
             ticket_data.get('asset_id', ''),
             ticket_data.get('original_description', ''),
             ticket_data.get('corrected_description', ''),
-            ticket_data.get('category', 'General'),
-            ticket_data.get('priority', 'P3 - Medium'),
-            'Open',
+            self._encode_label('category', ticket_data.get('category', 'General'), create=True),
+            self._encode_label('priority', ticket_data.get('priority', 'P3 - Medium'), create=True),
+            self._encode_label('status', status, create=True),
             ticket_data.get('assigned_to', 'Unassigned'),
+            ticket_data.get('assigned_team'),
             now,
             now,
+            self.to_epoch(now),
+            self.to_epoch(now),
             json.dumps(ticket_data.get('metadata', {}))
-        ))
-        
-        conn.commit()
-        self.add_history(ticket_id, 'Created', 'System', 'Ticket created', conn)
-        conn.close()
-        
-        return ticket_id
+        )
     
     def get_ticket(self, ticket_id):
         """Get ticket by ID"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        return self.get_ticket_record(ticket_id)[0]
+    
+    def get_ticket_record(self, ticket_id):
+        """
+        Get a ticket together with its history
         
-        cursor.execute('SELECT * FROM tickets WHERE ticket_id = ?', (ticket_id,))
-        row = cursor.fetchone()
-        conn.close()
+        Records are served from the ticket cache once changes made by
+        other processes have been applied (see _sync_ticket_cache), and
+        loaded on the same connection otherwise.
         
-        if row:
-            return dict(row)
-        return None
+        Returns:
+            tuple: (ticket dict or None, list of history dicts)
+        """
+        with self.pool.connection() as conn:
+            if self.ticket_cache.enabled:
+                self._sync_ticket_cache(conn)
+                record = self.ticket_cache.get(ticket_id)
+                if record is not None:
+                    return record
+            
+            token = self.ticket_cache.token()
+            row = conn.execute('SELECT * FROM tickets WHERE ticket_id = ?', (ticket_id,)).fetchone()
+            if row is not None:
+                history = [dict(h) for h in conn.execute(self.HISTORY_QUERY, (ticket_id,)).fetchall()]
+            else:
+                row, history = self._get_archived_record(conn, ticket_id)
+                if row is None:
+                    return None, []
+        
+        record = (self._row_to_ticket(row), history)
+        self.ticket_cache.put(ticket_id, record, token)
+        return record
     
-    def get_all_tickets(self, filters=None):
-        """Get all tickets with optional filters"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def _archived_month(self, ticket_id):
+        """Get the partition month that may hold a ticket, or None"""
+        if self.partitions is None:
+            return None
+        month = self.partitions.month_for_ticket(ticket_id)
+        return month if month in self.partitions.months() else None
+    
+    def _get_archived_record(self, conn, ticket_id):
+        """Look a ticket and its history up in the partition its ID points to"""
+        month = self._archived_month(ticket_id)
+        if month is None:
+            return None, []
+        with self.partitions.attach(conn, month) as schema:
+            row = conn.execute(f'SELECT * FROM {schema}.tickets WHERE ticket_id = ?', (ticket_id,)).fetchone()
+            history = [dict(h) for h in conn.execute(
+                f'SELECT * FROM {schema}.ticket_history WHERE ticket_id = ? ORDER BY timestamp DESC',
+                (ticket_id,)
+            ).fetchall()]
+        return row, history
+    
+    def get_all_tickets(self, filters=None, limit=None, cursor=None, fields=None):
+        """
+        Get tickets with optional filters, newest first
+        
+        Args:
+            filters (dict): Optional status/category/priority/assigned_to/
+                department/date_from/date_to filters
+            limit (int): Maximum number of tickets to return (None for all)
+            cursor (str): Return tickets after this cursor (see get_ticket_page)
+            fields: Columns to return - None for all, a FIELD_SETS name such
+                as 'summary', or a list of column and field set names
+            
+        Returns:
+            list: Ticket dicts ordered by (created_timestamp, ticket_id) descending
+        """
+        query, params = self._build_ticket_query(filters, limit, cursor, fields)
+        
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            for month in self._partitions_for(filters, cursor):
+                if limit is not None and len(rows) >= limit:
+                    # Partitions are newest first; stop once a whole month is
+                    # older than the last row we would return
+                    if rows[limit - 1]['created_timestamp'] >= self.partitions.month_bounds(month)[1]:
+                        break
+                with self.partitions.attach(conn, month) as schema:
+                    query, params = self._build_ticket_query(filters, limit, cursor, fields,
+                                                             table=f'{schema}.tickets')
+                    rows.extend(conn.execute(query, params).fetchall())
+                rows.sort(key=lambda row: (row['created_timestamp'], row['ticket_id']), reverse=True)
+                if limit is not None:
+                    rows = rows[:limit]
+        
+        return [self._row_to_ticket(row) for row in rows]
+    
+    def _partitions_for(self, filters=None, cursor=None):
+        """Get the partition months a list query has to read, newest first"""
+        if self.partitions is None:
+            return []
+        start = end = None
+        if filters and (filters.get('date_from') or filters.get('date_to')):
+            start, end = (value.isoformat() if value else None for value in self._date_range(filters))
+        months = self.partitions.months_overlapping(start, end)
+        if cursor:
+            # Months starting after the cursor only hold rows already returned
+            created, _ticket_id = self.decode_cursor(cursor)
+            months = [month for month in months if self.partitions.month_bounds(month)[0] <= created]
+        return months
+    
+    def get_ticket_page(self, filters=None, limit=25, cursor=None, fields=None):
+        """
+        Get one keyset page of tickets
         
-        query = 'SELECT * FROM tickets WHERE 1=1'
+        Args:
+            filters (dict): Same filters as get_all_tickets
+            limit (int): Page size
+            cursor (str): Cursor returned with the previous page, or None
+            fields: Column projection, as for get_all_tickets
+            
+        Returns:
+            tuple: (list of ticket dicts, next page cursor or None)
+        """
+        # Fetch one extra row to know whether another page exists
+        tickets = self.get_all_tickets(filters, limit=limit + 1, cursor=cursor, fields=fields)
+        
+        next_cursor = None
+        if len(tickets) > limit:
+            tickets = tickets[:limit]
+            next_cursor = self.encode_cursor(tickets[-1])
+        
+        return tickets, next_cursor
+    
+    def search_tickets_by_email(self, email, limit=100, cursor=None):
+        """
+        Find tickets raised by an email address (case-insensitive)
+        
+        Archived tickets are looked up in each partition through its
+        email index, so requesters keep finding their old tickets.
+        
+        Args:
+            email (str): Requester email address
+            limit (int): Maximum number of tickets to return
+            cursor (str): Cursor from a previous page, or None for the first page
+            
+        Returns:
+            tuple: (list of ticket dicts, next page cursor or None, total matches)
+        """
+        query, params = self._build_email_query(email, limit, cursor)
+        count_query = 'SELECT COUNT(*) FROM {table} WHERE email_normalized = ?'
+        email_params = (self.normalize_email(email),)
+        
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            total = conn.execute(count_query.format(table='tickets'), email_params).fetchone()[0]
+            page_months = set(self._partitions_for(cursor=cursor))
+            for month in self._partitions_for():
+                with self.partitions.attach(conn, month) as schema:
+                    total += conn.execute(count_query.format(table=f'{schema}.tickets'),
+                                          email_params).fetchone()[0]
+                    # Partitions are newest first; skip months before the
+                    # cursor or older than a page that is already full
+                    if month not in page_months or (
+                            len(rows) > limit
+                            and rows[limit]['created_timestamp'] >= self.partitions.month_bounds(month)[1]):
+                        continue
+                    query, params = self._build_email_query(email, limit, cursor, table=f'{schema}.tickets')
+                    rows.extend(conn.execute(query, params).fetchall())
+                rows.sort(key=lambda row: (row['created_timestamp'], row['ticket_id']), reverse=True)
+                rows = rows[:limit + 1]
+        
+        tickets = [self._row_to_ticket(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = self.encode_cursor(tickets[-1])
+        
+        return tickets, next_cursor, total
+    
+    def _build_email_query(self, email, limit, cursor, table='tickets'):
+        """Build the keyset-paginated email lookup query"""
+        query = f'SELECT * FROM {table} WHERE email_normalized = ?'
+        params = [self.normalize_email(email)]
+        
+        if cursor:
+            created, ticket_id = self.decode_cursor(cursor)
+            query += ' AND (created_timestamp, ticket_id) < (?, ?)'
+            params.extend([created, ticket_id])
+        
+        # Fetch one extra row to know whether another page exists
+        query += ' ORDER BY created_timestamp DESC, ticket_id DESC LIMIT ?'
+        params.append(int(limit) + 1)
+        
+        return query, params
+    
+    @staticmethod
+    def normalize_email(email):
+        """Normalize an email address for lookups"""
+        return (email or '').strip().lower()
+    
+    @staticmethod
+    def encode_cursor(ticket):
+        """Encode a pagination cursor from the last ticket of a page"""
+        key = json.dumps([ticket['created_timestamp'], ticket['ticket_id']])
+        return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a pagination cursor
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            created, ticket_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ValueError('Invalid cursor')
+        return str(created), str(ticket_id)
+    
+    def resolve_fields(self, fields):
+        """
+        Expand a field selection into a list of ticket columns
+        
+        ticket_id and created_timestamp are always included because
+        pagination cursors are built from them.
+        
+        Args:
+            fields: None, a field set name, a comma-separated string or a list
+            
+        Returns:
+            list: Column names, or None for all columns
+            
+        Raises:
+            ValueError: If a name is neither a column nor a field set
+        """
+        if fields is None:
+            return None
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(',') if name.strip()]
+        
+        columns = ['ticket_id', 'created_timestamp']
+        for name in fields:
+            expanded = self.FIELD_SETS.get(name, (name,))
+            for column in expanded:
+                if column not in self.TICKET_FIELDS:
+                    raise ValueError(f'Unknown ticket field: {column}')
+                if column not in columns:
+                    columns.append(column)
+        return columns
+    
+    def _select_list(self, fields, table=None):
+        """Build the SELECT column list for a field selection"""
+        columns = self.resolve_fields(fields)
+        prefix = f'{table}.' if table else ''
+        if columns is None:
+            return f'{prefix}*'
+        # Compacted text needs its storage flags (and the corrected
+        # description its original) to be decoded
+        if any(column in columns for column in self.COMPACT_COLUMNS):
+            columns.append('storage_flags')
+            if 'corrected_description' in columns and 'original_description' not in columns:
+                columns.append('original_description')
+        columns = [self.LABEL_COLUMNS[column][0] if column in self.LABEL_COLUMNS else column
+                   for column in columns]
+        return ', '.join(f'{prefix}{column}' for column in columns)
+    
+    def _row_to_ticket(self, row):
+        """Convert a tickets row into the public ticket dict"""
+        ticket = dict(row)
+        flags = ticket.get('storage_flags')
+        if flags:
+            self.codec.decode(ticket, flags)
+        for column, (code_column, _table) in self.LABEL_COLUMNS.items():
+            if code_column in ticket:
+                code = ticket.pop(code_column)
+                # Partitions archived before the codes keep their text too
+                if code is not None or ticket.get(column) is None:
+                    ticket[column] = self._decode_label(column, code)
+        for column in self.INTERNAL_COLUMNS:
+            ticket.pop(column, None)
+        return ticket
+    
+    def _build_filter_clause(self, filters=None):
+        """Build the WHERE clause shared by list and statistics queries"""
+        clauses = ['1=1']
         params = []
         
         if filters:
-            if filters.get('status'):
-                query += ' AND status = ?'
-                params.append(filters['status'])
-            if filters.get('category'):
-                query += ' AND category = ?'
-                params.append(filters['category'])
-            if filters.get('priority'):
-                query += ' AND priority = ?'
-                params.append(filters['priority'])
+            for column, (code_column, _table) in self.LABEL_COLUMNS.items():
+                if filters.get(column):
+                    clauses.append(f'{code_column} = ?')
+                    params.append(self._filter_code(column, filters[column]))
             if filters.get('assigned_to'):
-                query += ' AND assigned_to = ?'
+                clauses.append('assigned_to = ?')
                 params.append(filters['assigned_to'])
+            if filters.get('department'):
+                clauses.append('department = ?')
+                params.append(filters['department'])
+            if filters.get('date_from') or filters.get('date_to'):
+                start, end = self._date_range(filters)
+                if self.epochs_ready:
+                    column, start, end = 'created_epoch', self.to_epoch(start), self.to_epoch(end)
+                else:
+                    # ISO strings sort chronologically, so a text range is indexable too
+                    column, start, end = 'created_timestamp', start and start.isoformat(), end and end.isoformat()
+                if start is not None:
+                    clauses.append(f'{column} >= ?')
+                    params.append(start)
+                if end is not None:
+                    clauses.append(f'{column} < ?')
+                    params.append(end)
+        
+        return ' AND '.join(clauses), params
+    
+    def _filter_code(self, column, name):
+        """Get the code to filter a coded column on (-1 matches nothing)"""
+        code = self._encode_label(column, name)
+        return -1 if code is None else code
+    
+    @staticmethod
+    def _date_range(filters):
+        """
+        Turn inclusive date_from/date_to (YYYY-MM-DD) into a half-open range
+        
+        Returns:
+            tuple: (start datetime or None, exclusive end datetime or None)
+            
+        Raises:
+            ValueError: If a date is not in YYYY-MM-DD format
+        """
+        start = end = None
+        try:
             if filters.get('date_from'):
-                query += ' AND DATE(created_timestamp) >= ?'
+                start = datetime.strptime(filters['date_from'], '%Y-%m-%d')
+            if filters.get('date_to'):
+                end = datetime.strptime(filters['date_to'], '%Y-%m-%d') + timedelta(days=1)
+        except ValueError:
+            raise ValueError('Dates must use the YYYY-MM-DD format')
+        return start, end
+    
+    def get_statistics(self, filters=None):
+        """
+        Get ticket counts grouped by status, priority and category
+        
+        Counts are read from the trigger-maintained statistics table, whose
+        size depends on the number of distinct status/priority/category/
+        department combinations rather than the number of tickets. Filters
+        the counters cannot answer (e.g. assigned_to) fall back to one
+        grouped query over tickets.
+        
+        Args:
+            filters (dict): Optional list filters (date range, department, ...)
+            
+        Returns:
+            dict: total, by_status, by_priority and by_category counts
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        if any(key not in self.STATISTICS_FILTERS for key in filters):
+            return self._compute_statistics(filters)
+        
+        clauses = []
+        params = []
+        if filters.get('date_from') or filters.get('date_to'):
+            self._date_range(filters)
+            clauses.append("day != ''")
+            if filters.get('date_from'):
+                clauses.append('day >= ?')
                 params.append(filters['date_from'])
             if filters.get('date_to'):
-                query += ' AND DATE(created_timestamp) <= ?'
+                clauses.append('day <= ?')
                 params.append(filters['date_to'])
+        else:
+            # All-time rollup rows
+            clauses.append("day = ''")
+        for column, (code_column, _table) in self.LABEL_COLUMNS.items():
+            if filters.get(column):
+                clauses.append(f'{code_column} = ?')
+                params.append(self._filter_code(column, filters[column]))
+        if filters.get('department'):
+            clauses.append('department = ?')
+            params.append(filters['department'])
+        
+        query = f'''
+            SELECT status_code, priority_code, category_code, SUM(count) AS count
+            FROM statistics WHERE {' AND '.join(clauses)}
+            GROUP BY status_code, priority_code, category_code
+            HAVING SUM(count) > 0
+        '''
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return self._fold_statistics(rows)
+    
+    def _compute_statistics(self, filters=None):
+        """Compute statistics directly from the tickets table and the overlapping partitions"""
+        where, params = self._build_filter_clause(filters)
+        query = f'''
+            SELECT IFNULL(status_code, 0), IFNULL(priority_code, 0), IFNULL(category_code, 0),
+                   COUNT(*) AS count
+            FROM {{table}} WHERE {where}
+            GROUP BY 1, 2, 3
+        '''
+        with self.pool.connection() as conn:
+            rows = conn.execute(query.format(table='tickets'), params).fetchall()
+            for month in self._partitions_for(filters):
+                with self.partitions.attach(conn, month) as schema:
+                    rows.extend(conn.execute(query.format(table=f'{schema}.tickets'), params).fetchall())
+        return self._fold_statistics(rows)
+    
+    def _fold_statistics(self, rows):
+        """Fold (status, priority, category code, count) rows into breakdowns"""
+        stats = {'total': 0, 'by_status': {}, 'by_priority': {}, 'by_category': {}}
+        for status_code, priority_code, category_code, count in rows:
+            # Code 0 counts tickets without a value
+            status = self._decode_label('status', status_code) if status_code else ''
+            priority = self._decode_label('priority', priority_code) if priority_code else ''
+            category = self._decode_label('category', category_code) if category_code else ''
+            stats['total'] += count
+            stats['by_status'][status] = stats['by_status'].get(status, 0) + count
+            stats['by_priority'][priority] = stats['by_priority'].get(priority, 0) + count
+            stats['by_category'][category] = stats['by_category'].get(category, 0) + count
+        
+        return stats
+    
+    def rebuild_statistics(self):
+        """
+        Recompute the statistics counters from the tickets table
         
-        query += ' ORDER BY created_timestamp DESC'
+        Archived tickets are added back one partition at a time after the
+        live table has been counted.
         
-        cursor.execute(query, params)
-        tickets = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        Returns:
+            int: Number of counter rows written
+        """
+        with self.pool.transaction() as conn:
+            conn.execute('DELETE FROM statistics')
+            conn.execute(self.STATISTICS_REBUILD_SQL)
+        
+        with self.pool.connection() as conn:
+            for month in (self.partitions.months() if self.partitions else []):
+                with self.partitions.attach(conn, month) as schema:
+                    with self.pool.transaction():
+                        conn.execute(self.STATISTICS_ADD_SQL.format(source=f'{schema}.tickets', where='1=1'))
+            return conn.execute('SELECT COUNT(*) FROM statistics').fetchone()[0]
+    
+    def archive_tickets(self, older_than_months=3, statuses=('Resolved', 'Closed')):
+        """
+        Move closed tickets of past months into monthly partition files
+        
+        Only tickets in ``statuses`` created before the start of the month
+        ``older_than_months`` ago are moved; open work always stays in the
+        live table. Archived tickets keep counting in the statistics and
+        stay readable through get_ticket, get_all_tickets and the email
+        lookup, but are no longer updatable and drop out of the full-text
+        search.
+        
+        Returns:
+            dict: Number of tickets moved per partition month (YYYYMM)
+        """
+        if self.partitions is None:
+            raise RuntimeError('Ticket partitioning is not enabled')
+        if not self.epochs_ready:
+            self.backfill_epochs()
+        
+        today = datetime.now()
+        month_index = today.year * 12 + today.month - 1 - int(older_than_months)
+        cutoff = f'{month_index // 12:04d}-{month_index % 12 + 1:02d}-01'
+        codes = self._status_codes(statuses)
+        placeholders = ', '.join('?' * len(codes))
+        
+        with self.pool.connection() as conn:
+            months = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT SUBSTR(created_timestamp, 1, 4) || SUBSTR(created_timestamp, 6, 2) "
+                f"FROM tickets WHERE created_timestamp < ? AND status_code IN ({placeholders})",
+                [cutoff] + codes
+            ).fetchall()]
+            moved = {month: self._archive_month(conn, month, codes) for month in sorted(months)}
+        
+        self.partitions.refresh()
+        return moved
+    
+    def _status_codes(self, statuses):
+        """Get the codes of the known names among ``statuses``"""
+        codes = (self._encode_label('status', status) for status in statuses)
+        return [code for code in codes if code is not None]
+    
+    def _archive_month(self, conn, month, status_codes):
+        """Move one month's closed tickets and their history into its partition"""
+        start, end = self.partitions.month_bounds(month)
+        placeholders = ', '.join('?' * len(status_codes))
+        batch = 'ticket_id IN (SELECT ticket_id FROM temp.archive_batch)'
+        
+        with self.partitions.attach(conn, month, readonly=False) as schema:
+            # Same thread-bound connection, so the partition is attached to it
+            with self.pool.transaction():
+                self.partitions.ensure_schema(conn, schema)
+                conn.execute('CREATE TEMP TABLE IF NOT EXISTS archive_batch (ticket_id TEXT PRIMARY KEY)')
+                conn.execute('DELETE FROM temp.archive_batch')
+                # Tickets whose ID month differs from their creation month
+                # (created across midnight) stay live so ID routing holds
+                count = conn.execute(
+                    f"INSERT INTO temp.archive_batch SELECT ticket_id FROM main.tickets "
+                    f"WHERE created_timestamp >= ? AND created_timestamp < ? AND status_code IN ({placeholders}) "
+                    f"AND SUBSTR(ticket_id, INSTR(ticket_id, '-') + 1, 6) = ?",
+                    [start, end] + status_codes + [month]
+                ).rowcount
+                
+                for table in ('tickets', 'ticket_history'):
+                    columns = ', '.join(row['name'] for row in conn.execute(f'PRAGMA main.table_info({table})'))
+                    conn.execute(f'INSERT OR REPLACE INTO {schema}.{table} ({columns}) '
+                                 f'SELECT {columns} FROM main.{table} WHERE {batch}')
+                
+                last_change = self.get_data_version(conn)
+                conn.execute(f'DELETE FROM main.ticket_history WHERE {batch}')
+                conn.execute(f'DELETE FROM main.tickets WHERE {batch}')
+                # The delete triggers uncounted the moved tickets; archived
+                # tickets still count, and moving them is not a change
+                conn.execute(self.STATISTICS_ADD_SQL.format(source=f'{schema}.tickets', where=batch))
+                conn.execute('DELETE FROM ticket_changes WHERE seq > ?', (last_change,))
+        
+        return count
+    
+    def compact_tickets(self, older_than_days=90, statuses=('Resolved', 'Closed'), batch_size=500):
+        """
+        Re-encode the text columns of closed tickets in compact form
+        
+        Tickets in ``statuses`` not updated for ``older_than_days`` get
+        their corrected description stored as a flag or diff against the
+        original and long text and metadata zlib-compressed (see
+        TicketCodec). Reads decode transparently; updating the text
+        expands the ticket again. Freed pages are reused by new rows; run
+        VACUUM to shrink the file itself.
+        
+        Returns:
+            int: Number of tickets compacted
+        """
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        codes = self._status_codes(statuses)
+        placeholders = ', '.join('?' * len(codes))
+        compacted = 0
+        last_rowid = 0
+        
+        while True:
+            with self.pool.transaction() as conn:
+                rows = conn.execute(
+                    f'SELECT rowid, {", ".join(self.COMPACT_COLUMNS)} FROM tickets '
+                    f'WHERE rowid > ? AND storage_flags = 0 AND status_code IN ({placeholders}) '
+                    f'AND updated_timestamp < ? ORDER BY rowid LIMIT ?',
+                    [last_rowid] + codes + [cutoff, batch_size]
+                ).fetchall()
+                for row in rows:
+                    columns, flags = self.codec.encode(dict(row))
+                    if not flags:
+                        continue
+                    set_clause = ', '.join(f'{column} = ?' for column in columns)
+                    conn.execute(f'UPDATE tickets SET {set_clause}, storage_flags = ? WHERE rowid = ?',
+                                 list(columns.values()) + [flags, row['rowid']])
+                    compacted += 1
+            if len(rows) < batch_size:
+                return compacted
+            last_rowid = rows[-1]['rowid']
+    
+    def _expand_ticket(self, conn, ticket_id):
+        """Store a compacted ticket's text columns as plain text again"""
+        row = conn.execute(
+            f'SELECT {", ".join(self.COMPACT_COLUMNS)}, storage_flags FROM tickets '
+            f'WHERE ticket_id = ? AND storage_flags != 0',
+            (ticket_id,)
+        ).fetchone()
+        if row is None:
+            return
+        plain = self.codec.decode(dict(row), row['storage_flags'])
+        conn.execute(
+            f'UPDATE tickets SET {", ".join(f"{column} = ?" for column in self.COMPACT_COLUMNS)}, '
+            f'storage_flags = 0 WHERE ticket_id = ?',
+            [plain[column] for column in self.COMPACT_COLUMNS] + [ticket_id]
+        )
+    
+    def rebuild_search_index(self):
+        """
+        Rebuild the full-text search index from the tickets table
+        
+        Returns:
+            int: Number of indexed tickets
+        """
+        with self.pool.transaction() as conn:
+            conn.execute('DELETE FROM tickets_fts')
+            conn.execute(self.SEARCH_REBUILD_SQL + ' WHERE storage_flags = 0')
+            # Compacted tickets are indexed from their decoded text
+            for row in conn.execute('SELECT rowid, * FROM tickets WHERE storage_flags != 0').fetchall():
+                ticket = self._row_to_ticket(row)
+                conn.execute(
+                    'INSERT INTO tickets_fts (rowid, ticket_id, corrected_description, '
+                    'original_description, resolution_notes) VALUES (?, ?, ?, ?, ?)',
+                    (row['rowid'], ticket['ticket_id'], ticket['corrected_description'],
+                     ticket['original_description'], ticket['resolution_notes'])
+                )
+            return conn.execute('SELECT COUNT(*) FROM tickets_fts').fetchone()[0]
+    
+    def search_tickets(self, text, filters=None, limit=25, offset=0, fields=None):
+        """
+        Full-text search over ticket descriptions and resolution notes
+        
+        Args:
+            text (str): Search words; every word must match (prefix match)
+            filters (dict): Optional list filters (status, category, priority, ...)
+            limit (int): Page size
+            offset (int): Number of ranked results to skip
+            fields: Column projection, as for get_all_tickets
+            
+        Returns:
+            tuple: (list of ticket dicts with an HTML-safe 'snippet' and
+                'rank', next offset or None)
+        """
+        match = self._build_match_expression(text)
+        if not match:
+            return [], None
+        
+        where, params = self._build_filter_clause(filters)
+        query = f'''
+            SELECT {self._select_list(fields, 'tickets')},
+                   snippet(tickets_fts, -1, ?, ?, '...', 16) AS snippet,
+                   bm25(tickets_fts) AS rank
+            FROM tickets_fts
+            JOIN tickets ON tickets.ticket_id = tickets_fts.ticket_id
+            WHERE tickets_fts MATCH ? AND {where}
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        '''
+        params = [self.SNIPPET_OPEN, self.SNIPPET_CLOSE, match] + params + [int(limit) + 1, int(offset)]
+        
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        results = []
+        for row in rows[:limit]:
+            ticket = self._row_to_ticket(row)
+            ticket['snippet'] = self._highlight_snippet(ticket['snippet'])
+            results.append(ticket)
+        
+        next_offset = offset + limit if len(rows) > limit else None
+        return results, next_offset
+    
+    @staticmethod
+    def _build_match_expression(text):
+        """Turn free text into a safe FTS5 query of quoted prefix terms"""
+        terms = re.findall(r'\w+', text or '')
+        return ' '.join('"{}"*'.format(term) for term in terms)
+    
+    def _highlight_snippet(self, snippet):
+        """HTML-escape a snippet and turn match markers into <mark> tags"""
+        escaped = html.escape(snippet or '')
+        return escaped.replace(self.SNIPPET_OPEN, '<mark>').replace(self.SNIPPET_CLOSE, '</mark>')
+    
+    def _build_ticket_query(self, filters=None, limit=None, cursor=None, fields=None, table='tickets'):
+        """Build the ticket list query and parameters for the given filters"""
+        where, params = self._build_filter_clause(filters)
+        query = f'SELECT {self._select_list(fields)} FROM {table} WHERE {where}'
+        
+        if cursor:
+            created, ticket_id = self.decode_cursor(cursor)
+            query += ' AND (created_timestamp, ticket_id) < (?, ?)'
+            params.extend([created, ticket_id])
+        
+        query += ' ORDER BY created_timestamp DESC, ticket_id DESC'
+        
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+        
+        return query, params
+    
+    def get_changes(self, since=None, filters=None, limit=500, fields=None):
+        """
+        Get tickets changed after a change sequence number
+        
+        Clients keep the returned ``next_since`` and pass it back on the
+        next poll, so each poll only reads what changed in between.
+        
+        Args:
+            since (int): Last sequence number the client has applied, or
+                None to just get the current one
+            filters (dict): List filters the client's view uses; changed
+                tickets that no longer match are reported as removed
+            limit (int): Maximum number of change log entries to read
+            fields: Column projection, as for get_all_tickets
+            
+        Returns:
+            dict: ``tickets`` (current rows of changed tickets that match),
+            ``removed`` (changed ticket IDs that no longer match or were
+            deleted), ``created`` (IDs of tickets first created in the
+            range), ``next_since``, ``has_more`` and ``reset`` (True when
+            the log no longer reaches back to ``since``, or a label was
+            renamed, and the client must reload its view)
+        """
+        changes = {'tickets': [], 'removed': [], 'created': [], 'has_more': False, 'reset': False}
+        
+        with self.pool.connection() as conn:
+            version = self.get_data_version(conn)
+            changes['next_since'] = version
+            if since is None:
+                return changes
+            
+            since = int(since)
+            oldest = conn.execute('SELECT MIN(seq) FROM ticket_changes').fetchone()[0]
+            if since < 0 or since > version or (oldest if oldest is not None else version + 1) > since + 1:
+                changes['reset'] = True
+                return changes
+            
+            rows = conn.execute(
+                'SELECT seq, ticket_id, change_type FROM ticket_changes WHERE seq > ? ORDER BY seq LIMIT ?',
+                (since, int(limit) + 1)
+            ).fetchall()
+            if len(rows) > limit:
+                rows = rows[:limit]
+                changes['has_more'] = True
+            if not rows:
+                changes['next_since'] = since
+                return changes
+            changes['next_since'] = rows[-1]['seq']
+            
+            if any(row['change_type'] == 'relabeled' for row in rows):
+                # Every ticket with the renamed label changed; reload instead
+                self._load_labels(conn)
+                changes.update(reset=True, has_more=False, next_since=version)
+                return changes
+            ticket_ids = list(dict.fromkeys(row['ticket_id'] for row in rows))
+            changes['created'] = [row['ticket_id'] for row in rows if row['change_type'] == 'created']
+            where, params = self._build_filter_clause(filters)
+            # CROSS JOIN pins the plan to ticket_id lookups; a filter index
+            # would otherwise be picked and scan the whole filtered view
+            cursor = conn.execute(
+                f'SELECT {self._select_list(fields, "tickets")} '
+                f'FROM json_each(?) AS changed CROSS JOIN tickets ON tickets.ticket_id = changed.value '
+                f'WHERE {where} ORDER BY created_timestamp DESC, tickets.ticket_id DESC',
+                [json.dumps(ticket_ids)] + params
+            )
+            changes['tickets'] = [self._row_to_ticket(row) for row in cursor.fetchall()]
+        
+        matched = {ticket['ticket_id'] for ticket in changes['tickets']}
+        changes['removed'] = [ticket_id for ticket_id in ticket_ids if ticket_id not in matched]
+        return changes
+    
+    def prune_changes(self, older_than_days=7):
+        """
+        Delete change log entries older than the given age
+        
+        Clients whose cursor predates the pruned range get ``reset`` from
+        get_changes and reload.
         
-        return tickets
+        Returns:
+            int: Number of deleted entries
+        """
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        with self.pool.transaction() as conn:
+            return conn.execute('DELETE FROM ticket_changes WHERE changed_at < ?', (cutoff,)).rowcount
     
-    def update_ticket(self, ticket_id, updates):
-        """Update ticket details"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def update_ticket(self, ticket_id, updates, expected_version=None, assigned_to=None,
+                      action='Updated', details=None):
+        """
+        Update ticket details
+        
+        Setting status to 'Resolved' also stamps resolved_timestamp
+        unless the update provides one. Every update bumps the ticket's
+        version.
         
+        With ``expected_version`` and/or ``assigned_to`` the update only
+        applies while the ticket still has that version and assignee.
+        The UPDATE checks them itself, so there is no separate read that
+        a concurrent edit or reassignment could slip in after.
+        
+        Args:
+            ticket_id (str): Ticket to update
+            updates (dict): Column values to set (plus optional performed_by)
+            expected_version (int): Version the caller last read, or None
+            assigned_to (str): Required current assignee, or None
+            action (str): History action to record
+            details (str): History details, or None to list the fields
+            
+        Returns:
+            bool: Whether the ticket was updated
+        """
         performed_by = updates.pop('performed_by', 'System')
-        updates['updated_timestamp'] = datetime.now().isoformat()
-
-        set_clause = ', '.join([f'{key} = ?' for key in updates.keys()])
-        values = list(updates.values()) + [ticket_id]
+        columns, field_details = self._update_columns(updates)
+        details = details or field_details
 
-        cursor.execute(f'UPDATE tickets SET {set_clause} WHERE ticket_id = ?', values)
-        conn.commit()
+        set_clause = ', '.join([f'{key} = ?' for key in columns.keys()]) + ', version = version + 1'
+        conditions = ['ticket_id = ?']
+        values = list(columns.values()) + [ticket_id]
+        if expected_version is not None:
+            conditions.append('version = ?')
+            values.append(int(expected_version))
+        if assigned_to is not None:
+            conditions.append('assigned_to = ?')
+            values.append(assigned_to)
 
-        self.add_history(ticket_id, 'Updated', performed_by, f'Updated: {", ".join(updates.keys())}', conn)
-        conn.close()
+        def update(conn):
+            if any(column in columns for column in self.COMPACT_COLUMNS):
+                self._expand_ticket(conn, ticket_id)
+            cursor = conn.execute(f'UPDATE tickets SET {set_clause} WHERE {" AND ".join(conditions)}', values)
+            if cursor.rowcount == 0:
+                live = conn.execute('SELECT 1 FROM tickets WHERE ticket_id = ?', (ticket_id,)).fetchone()
+                if live is None and self._archived_month(ticket_id):
+                    raise ValueError(f'Ticket {ticket_id} is archived and read-only')
+                return False
+            self.add_history(ticket_id, action, performed_by, details, conn)
+            return True
+        
+        try:
+            return self._write(update)
+        finally:
+            self.ticket_cache.invalidate(ticket_id)
     
-    def add_history(self, ticket_id, action, performed_by, details, conn=None):
-        """Add ticket to history"""
-        close_conn = False
-        if conn is None:
-            conn = sqlite3.connect(self.db_path)
-            close_conn = True
+    def _update_columns(self, updates):
+        """
+        Complete an update and map it onto stored columns
         
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO ticket_history (ticket_id, action, performed_by, timestamp, details)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (ticket_id, action, performed_by, datetime.now().isoformat(), details))
+        Stamps updated_timestamp (and resolved_timestamp when resolving)
+        into ``updates`` and keeps derived storage columns in step with
+        the values they shadow.
         
-        conn.commit()
+        Returns:
+            tuple: (dict of column values to set, history details text)
+        """
+        now = datetime.now().isoformat()
+        updates['updated_timestamp'] = now
+        if updates.get('status') == 'Resolved':
+            updates.setdefault('resolved_timestamp', now)
+        details = f'Updated: {", ".join(updates.keys())}'
+        
+        columns = dict(updates)
+        if 'user_email' in updates:
+            columns['email_normalized'] = self.normalize_email(updates['user_email'])
+        for timestamp_column, epoch_column in self.EPOCH_COLUMNS.items():
+            if timestamp_column in updates:
+                columns[epoch_column] = self.to_epoch(updates[timestamp_column])
+        for column, (code_column, _table) in self.LABEL_COLUMNS.items():
+            if column in columns:
+                columns[code_column] = self._encode_label(column, columns.pop(column), create=True)
+        # A claim lease ends once work starts or the ticket is reassigned
+        if 'assigned_to' in updates or updates.get('status', 'Assigned') != 'Assigned':
+            columns['claim_expires_epoch'] = None
+        return columns, details
+    
+    def bulk_update(self, filter_or_ids, updates, performed_by='System'):
+        """
+        Apply the same update to many tickets in one transaction
         
-        if close_conn:
-            conn.close()
+        The selected tickets are updated by one set-based UPDATE and get
+        their history entries from one INSERT ... SELECT, so closing a few
+        hundred tickets costs a single commit. Archived tickets are left
+        alone.
+        
+        Args:
+            filter_or_ids: List of ticket IDs, or a filters dict as for
+                get_all_tickets (assigned_to included)
+            updates (dict): Column values to set, as for update_ticket
+            performed_by (str): Name recorded in the history entries
+            
+        Returns:
+            list: IDs of the updated tickets
+            
+        Raises:
+            ValueError: If nothing selects the tickets or a column is not
+                updatable
+        """
+        updates = dict(updates)
+        for column in updates:
+            if column not in self.TICKET_FIELDS or column in ('ticket_id', 'created_timestamp', 'version'):
+                raise ValueError(f'Cannot bulk update ticket field: {column}')
+        if not updates:
+            raise ValueError('No updates provided')
+        
+        if isinstance(filter_or_ids, dict):
+            where, params = self._build_filter_clause(filter_or_ids)
+            if not params:
+                raise ValueError('Bulk update needs ticket IDs or at least one filter')
+            select = f'SELECT ticket_id FROM tickets WHERE {where}'
+        else:
+            ticket_ids = list(dict.fromkeys(filter_or_ids or []))
+            if not ticket_ids:
+                raise ValueError('Bulk update needs ticket IDs or at least one filter')
+            select = ('SELECT tickets.ticket_id FROM json_each(?) AS requested '
+                      'CROSS JOIN tickets ON tickets.ticket_id = requested.value')
+            params = [json.dumps(ticket_ids)]
+        
+        columns, details = self._update_columns(updates)
+        set_clause = ', '.join(f'{key} = ?' for key in columns) + ', version = version + 1'
+        batch = 'ticket_id IN (SELECT ticket_id FROM temp.bulk_batch)'
+        
+        def update(conn):
+            # Pin the selection first; the update may change what the filters match
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS bulk_batch (ticket_id TEXT PRIMARY KEY)')
+            conn.execute('DELETE FROM temp.bulk_batch')
+            conn.execute(f'INSERT INTO temp.bulk_batch {select}', params)
+            if any(column in columns for column in self.COMPACT_COLUMNS):
+                compacted = conn.execute(
+                    f'SELECT ticket_id FROM tickets WHERE {batch} AND storage_flags != 0'
+                ).fetchall()
+                for row in compacted:
+                    self._expand_ticket(conn, row['ticket_id'])
+            conn.execute(f'UPDATE tickets SET {set_clause} WHERE {batch}', list(columns.values()))
+            conn.execute(
+                f"INSERT INTO ticket_history (ticket_id, action, performed_by, timestamp, details) "
+                f"SELECT ticket_id, 'Updated', ?, ?, ? FROM temp.bulk_batch",
+                (performed_by, updates['updated_timestamp'], details)
+            )
+            return [row['ticket_id'] for row in conn.execute('SELECT ticket_id FROM temp.bulk_batch')]
+        
+        updated = self._write(update)
+        if len(updated) > self.ticket_cache.max_size:
+            self.ticket_cache.clear()
+        else:
+            for ticket_id in updated:
+                self.ticket_cache.invalidate(ticket_id)
+        return updated
     
-    def get_ticket_history(self, ticket_id):
-        """Get ticket history"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def claim_next_ticket(self, teams, claimed_by, lease_seconds=1800):
+        """
+        Claim the most urgent unclaimed ticket of a technician's teams
         
-        cursor.execute('''
-            SELECT * FROM ticket_history WHERE ticket_id = ?
-            ORDER BY timestamp DESC
-        ''', (ticket_id,))
+        One UPDATE ... RETURNING picks the highest-priority, oldest Open
+        'Unassigned' ticket of ``teams`` and assigns it, so concurrent
+        claimers are serialized by the write lock and never get the same
+        ticket. The claim is a lease: a ticket still 'Assigned' (work not
+        started) when the lease runs out goes back to the queue. Expired
+        leases are released by the next claim.
         
-        history = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        Args:
+            teams (list): Team names whose queues to claim from
+            claimed_by (str): Technician taking the ticket
+            lease_seconds (int): How long the claim holds without progress
+            
+        Returns:
+            dict: The claimed ticket plus its 'claim_expires' timestamp,
+            or None when the queues are empty
+        """
+        teams = list(teams)
+        if not teams:
+            return None
+        
+        # Stored timestamps keep microseconds like every other write, so
+        # history entries sort correctly; the lease itself is whole seconds
+        now = datetime.now()
+        expires = (now + timedelta(seconds=int(lease_seconds))).replace(microsecond=0)
+        open_code = self._encode_label('status', 'Open', create=True)
+        assigned_code = self._encode_label('status', 'Assigned', create=True)
+        placeholders = ', '.join('?' * len(teams))
+        
+        def claim(conn):
+            released = self._release_expired_claims(conn, now, open_code)
+            # Seeded priority codes sort P1 first (see migration 9)
+            row = conn.execute(
+                f"""UPDATE tickets SET assigned_to = ?, status_code = ?, claim_expires_epoch = ?,
+                       updated_timestamp = ?, updated_epoch = ?, version = version + 1
+                   WHERE ticket_id = (
+                       SELECT ticket_id FROM tickets
+                       WHERE assigned_to = 'Unassigned' AND assigned_team IN ({placeholders})
+                             AND status_code = ?
+                       ORDER BY priority_code, created_timestamp LIMIT 1
+                   )
+                   RETURNING *""",
+                [claimed_by, assigned_code, self.to_epoch(expires), now.isoformat(), self.to_epoch(now)]
+                + teams + [open_code]
+            ).fetchone()
+            if row is not None:
+                self.add_history(row['ticket_id'], 'Claimed', claimed_by,
+                                 f'Claimed by {claimed_by} until {expires.isoformat()}', conn)
+            return released, row
+        
+        released, row = self._write(claim)
+        for ticket_id in released + ([row['ticket_id']] if row is not None else []):
+            self.ticket_cache.invalidate(ticket_id)
+        if row is None:
+            return None
+        ticket = self._row_to_ticket(row)
+        ticket['claim_expires'] = expires.isoformat()
+        return ticket
+    
+    def _release_expired_claims(self, conn, now, open_code):
+        """Put tickets whose claim lease ran out back in their team queue"""
+        released = [row['ticket_id'] for row in conn.execute(
+            """UPDATE tickets SET assigned_to = 'Unassigned', status_code = ?, claim_expires_epoch = NULL,
+                   updated_timestamp = ?, updated_epoch = ?, version = version + 1
+               WHERE claim_expires_epoch < ?
+               RETURNING ticket_id""",
+            (open_code, now.isoformat(), self.to_epoch(now), self.to_epoch(now))
+        ).fetchall()]
+        conn.executemany(self.INSERT_HISTORY_SQL, [
+            (ticket_id, 'Claim expired', 'System', now.isoformat(), 'Returned to the team queue')
+            for ticket_id in released
+        ])
+        return released
+
+    def get_open_assignments(self, closed_statuses=('Resolved', 'Closed')):
+        """
+        Get the team and assignee of every assigned, unresolved ticket
+
+        The change sequence is read first, so replaying get_changes from
+        it covers every write the list might have missed.
+
+        Returns:
+            tuple: (change sequence, list of (ticket_id, assigned_team,
+            assigned_to) tuples)
+        """
+        codes = self._status_codes(closed_statuses)
+        placeholders = ', '.join('?' * len(codes))
+        closed_clause = f' AND status_code NOT IN ({placeholders})' if codes else ''
+        with self.pool.connection() as conn:
+            version = self.get_data_version(conn)
+            rows = conn.execute(
+                "SELECT ticket_id, assigned_team, assigned_to FROM tickets "
+                "WHERE assigned_to IS NOT NULL AND assigned_to != 'Unassigned'" + closed_clause,
+                codes
+            ).fetchall()
+        return version, [tuple(row) for row in rows]
+
+    def get_open_tickets(self, fields=None, closed_statuses=('Resolved', 'Closed')):
+        """
+        Get every live ticket that is not resolved or closed
+
+        As with get_open_assignments, the change sequence is read first
+        so replaying get_changes from it covers later writes.
+
+        Returns:
+            tuple: (change sequence, list of ticket dicts)
+        """
+        codes = self._status_codes(closed_statuses)
+        placeholders = ', '.join('?' * len(codes))
+        where = f'status_code NOT IN ({placeholders})' if codes else '1'
+        with self.pool.connection() as conn:
+            version = self.get_data_version(conn)
+            rows = conn.execute(
+                f'SELECT {self._select_list(fields)} FROM tickets WHERE {where}', codes
+            ).fetchall()
+        return version, [self._row_to_ticket(row) for row in rows]
+
+    def add_history(self, ticket_id, action, performed_by, details, conn=None):
+        """
+        Add ticket to history
+        
+        When ``conn`` is given the entry joins the caller's transaction,
+        and the caller invalidates the cached record once it commits;
+        otherwise it is written in its own transaction.
+        """
+        if conn is None:
+            try:
+                self._write(lambda conn: self.add_history(ticket_id, action, performed_by, details, conn))
+            finally:
+                self.ticket_cache.invalidate(ticket_id)
+            return
         
-        return history
+        conn.execute(self.INSERT_HISTORY_SQL,
+                     (ticket_id, action, performed_by, datetime.now().isoformat(), details))
+    
+    def get_ticket_history(self, ticket_id):
+        """Get ticket history"""
+        return self.get_ticket_record(ticket_id)[1]
 
 
 class ExcelReportGenerator:
     """Generate Excel reports from ticket data"""
     
-    def __init__(self, output_dir='data/reports'):
-        """Initialize report generator"""
+    def __init__(self, output_dir='data/reports', db=None):
+        """
+        Initialize report generator
+        
+        Args:
+            output_dir (str): Folder reports are written to
+            db (TicketDatabase): Database history reports read from, so
+                archived tickets and the shared connection pool are used;
+                a default database is opened on first use when omitted
+        """
         self.output_dir = output_dir
+        self.db = db
         os.makedirs(output_dir, exist_ok=True)
     
     def generate_ticket_report(self, tickets, report_type='all', filename=None):
@@ -497,7 +2492,9 @@ class ExcelReportGenerator:
     
     def generate_history_report(self, tickets):
         """Generate report with ticket history and audit trail"""
-        db = TicketDatabase()
+        if self.db is None:
+            self.db = TicketDatabase()
+        db = self.db
         wb = openpyxl.Workbook()
         
         # Remove default sheet
@@ -617,3 +2614,47 @@ class ExcelReportGenerator:
         
         return filepath
 
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Ticket database maintenance')
+    parser.add_argument('command', choices=['check-plans', 'rebuild-statistics', 'rebuild-search',
+                                            'backfill-epochs', 'prune-changes', 'archive', 'compact',
+                                            'rename-label'])
+    parser.add_argument('--db', default='data/tickets/tickets.db', help='Path to tickets.db')
+    parser.add_argument('--days', type=int, help='Age in days for prune-changes (default 7) '
+                                                 'and compact (default 90)')
+    parser.add_argument('--partitions', help='Partition folder for archive')
+    parser.add_argument('--months', type=int, default=3, help='Keep this many recent months live when archiving')
+    parser.add_argument('--column', choices=sorted(TicketDatabase.LABEL_COLUMNS),
+                        help='Coded column for rename-label')
+    parser.add_argument('--old', help='Current name for rename-label')
+    parser.add_argument('--new', help='New name for rename-label')
+    args = parser.parse_args()
+    
+    db = TicketDatabase(args.db, partition_dir=args.partitions)
+    if args.command == 'check-plans':
+        for name, details in db.check_query_plans().items():
+            print(f"{name}: {' | '.join(details)}")
+        print(f"Schema version {db.get_schema_version()}: all query plans use indexes")
+    elif args.command == 'rebuild-statistics':
+        print(f"Rebuilt statistics: {db.rebuild_statistics()} counter rows")
+    elif args.command == 'rebuild-search':
+        print(f"Rebuilt search index: {db.rebuild_search_index()} tickets")
+    elif args.command == 'backfill-epochs':
+        print(f"Backfilled epoch timestamps: {db.backfill_epochs()} tickets")
+    elif args.command == 'prune-changes':
+        print(f"Pruned change log: {db.prune_changes(args.days or 7)} entries")
+    elif args.command == 'archive':
+        if not args.partitions:
+            parser.error('archive needs --partitions')
+        for month, count in db.archive_tickets(args.months).items():
+            print(f"Archived {count} tickets into {db.partitions.path(month)}")
+    elif args.command == 'compact':
+        print(f"Compacted {db.compact_tickets(args.days or 90)} closed tickets")
+    elif args.command == 'rename-label':
+        if not (args.column and args.old and args.new):
+            parser.error('rename-label needs --column, --old and --new')
+        count = db.rename_label(args.column, args.old, args.new)
+        print(f"Renamed {args.column} {args.old!r} to {args.new!r} ({count} live tickets)")
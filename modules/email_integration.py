@@ -222,6 +222,29 @@ Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 Please log into the support portal to view and respond to this ticket.
 
+Best regards,
+Ticket Management System
+        """
+        
+        return self.send_email(team_email, subject, body)
+    
+    def send_escalation_notification(self, team_email, ticket_id, ticket_data, reason):
+        """Send notification to support team about an SLA escalation"""
+        subject = f"SLA Escalation - {ticket_id}"
+        
+        body = f"""
+A ticket has missed its SLA target and was escalated.
+
+Ticket ID: {ticket_id}
+Reason: {reason}
+Priority: {ticket_data.get('priority', 'P3 - Medium')}
+Status: {ticket_data.get('status', 'Unknown')}
+Assigned To: {ticket_data.get('assigned_to', 'Unassigned')}
+Created: {ticket_data.get('created_timestamp', 'Unknown')}
+Issue: {(ticket_data.get('corrected_description') or 'N/A')[:200]}
+
+Please log into the support portal and respond to this ticket.
+
 Best regards,
 Ticket Management System
         """
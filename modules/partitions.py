@@ -0,0 +1,151 @@
+"""
+Ticket Partition Module
+Monthly archive files for old tickets, attached to queries on demand
+"""
+
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class PartitionStore:
+    """
+    Locates and attaches monthly ticket partition files
+
+    Each partition ``tickets_YYYYMM.db`` holds the archived tickets (and
+    their history) created in that month, with the same columns as the
+    main tickets table. Partitions are written only by the archive job
+    and are attached read-only for queries, one at a time, so the SQLite
+    attached database limit never comes into play.
+    """
+
+    FILE_PATTERN = re.compile(r'^tickets_(\d{6})\.db$')
+
+    # Ticket IDs embed their creation date: PREFIX-YYYYMMDD-XXXXXX
+    TICKET_ID_PATTERN = re.compile(r'^[A-Za-z]+-(\d{6})\d{2}-')
+
+    # Indexes kept in every partition (a subset of the main table's)
+    PARTITION_INDEXES = [
+        'CREATE INDEX IF NOT EXISTS {schema}.idx_tickets_created ON tickets(created_timestamp, ticket_id)',
+        'CREATE INDEX IF NOT EXISTS {schema}.idx_tickets_created_epoch ON tickets(created_epoch)',
+        'CREATE INDEX IF NOT EXISTS {schema}.idx_tickets_assigned_status_code '
+        'ON tickets(assigned_to, status_code, created_timestamp)',
+        'CREATE INDEX IF NOT EXISTS {schema}.idx_tickets_department_created '
+        'ON tickets(department, created_timestamp)',
+        'CREATE INDEX IF NOT EXISTS {schema}.idx_tickets_email_created '
+        'ON tickets(email_normalized, created_timestamp, ticket_id)',
+        'CREATE INDEX IF NOT EXISTS {schema}.idx_history_ticket_timestamp '
+        'ON ticket_history(ticket_id, timestamp)',
+    ]
+
+    def __init__(self, directory):
+        """
+        Initialize partition store
+
+        Args:
+            directory (str): Folder holding the partition files
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._months = None
+        self._listed_mtime = None
+
+    def path(self, month):
+        """Get the file path of a partition"""
+        return os.path.join(self.directory, f'tickets_{month}.db')
+
+    def months(self):
+        """
+        Get existing partition months (YYYYMM), newest first
+        
+        The listing is cached until the folder's modification time
+        changes, so partitions written by another process (e.g. the
+        archive CLI) are seen by running workers on their next read.
+        """
+        with self._lock:
+            mtime = os.stat(self.directory).st_mtime_ns
+            if self._months is None or mtime != self._listed_mtime:
+                found = (self.FILE_PATTERN.match(name) for name in os.listdir(self.directory))
+                self._months = sorted((m.group(1) for m in found if m), reverse=True)
+                self._listed_mtime = mtime
+            return list(self._months)
+
+    def refresh(self):
+        """Forget the cached partition list (after files were added)"""
+        with self._lock:
+            self._months = None
+
+    def month_for_ticket(self, ticket_id):
+        """Get the partition month a ticket ID belongs to, or None"""
+        match = self.TICKET_ID_PATTERN.match(ticket_id or '')
+        return match.group(1) if match else None
+
+    @staticmethod
+    def month_bounds(month):
+        """Get the half-open ISO timestamp range [start, end) of a month"""
+        year, mon = int(month[:4]), int(month[4:])
+        next_year, next_mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+        return f'{year:04d}-{mon:02d}-01', f'{next_year:04d}-{next_mon:02d}-01'
+
+    def months_overlapping(self, start=None, end=None):
+        """
+        Get partition months overlapping a half-open date range, newest first
+
+        Args:
+            start (str): ISO lower bound (inclusive), or None
+            end (str): ISO upper bound (exclusive), or None
+        """
+        selected = []
+        for month in self.months():
+            month_start, month_end = self.month_bounds(month)
+            if start and month_end <= start:
+                continue
+            if end and month_start >= end:
+                continue
+            selected.append(month)
+        return selected
+
+    @contextmanager
+    def attach(self, conn, month, readonly=True):
+        """
+        Attach a partition to a connection for the duration of the block
+
+        Yields:
+            str: Schema name to qualify partition tables with
+        """
+        schema = f'p_{month}'
+        uri = Path(self.path(month)).resolve().as_uri()
+        if readonly:
+            uri += '?mode=ro'
+        conn.execute('ATTACH DATABASE ? AS ' + schema, (uri,))
+        try:
+            yield schema
+        finally:
+            conn.execute(f'DETACH DATABASE {schema}')
+
+    def ensure_schema(self, conn, schema):
+        """
+        Create or extend partition tables to match the main tables
+
+        Columns are copied from the main database so archived rows can be
+        copied with ``INSERT ... SELECT`` over the main table columns.
+        """
+        for table in ('tickets', 'ticket_history'):
+            main_columns = conn.execute(f'PRAGMA main.table_info({table})').fetchall()
+            existing = {row['name'] for row in conn.execute(f'PRAGMA {schema}.table_info({table})')}
+            if not existing:
+                definitions = ', '.join(
+                    f"{row['name']} {row['type']}" + (' PRIMARY KEY' if row['pk'] else '')
+                    for row in main_columns
+                )
+                conn.execute(f'CREATE TABLE {schema}.{table} ({definitions})')
+                continue
+            for row in main_columns:
+                if row['name'] not in existing:
+                    conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {row['name']} {row['type']}")
+
+        for statement in self.PARTITION_INDEXES:
+            conn.execute(statement.format(schema=schema))
@@ -0,0 +1,272 @@
+"""
+SLA Escalation Module
+Escalates open tickets whose SLA response or resolution target has passed
+"""
+
+import heapq
+import os
+import threading
+from datetime import datetime
+
+
+class EscalationScheduler:
+    """
+    In-process scheduler of SLA escalation deadlines
+
+    Each open ticket has one pending deadline, kept in a min-heap:
+
+    * response: created + response_hours, while the ticket is still Open
+      or Assigned and has never been escalated
+    * resolution: created + resolution_hours, until it is resolved
+    * overdue: every ``escalation_hours`` after the last escalation once
+      the resolution target was missed
+
+    Deadlines that passed before the scheduler started are not escalated
+    in one burst on the first boot (or after downtime): a ticket moves on
+    to its next deadline still ahead. One already past its resolution
+    target without an escalation gets a late first escalation
+    ``escalation_hours`` after startup, noted as late in its history.
+
+    Deadlines are loaded once at startup and then follow the ticket
+    change log (creations, updates, resolutions and archiving from any
+    process), so the tickets table is never rescanned. A rescheduled
+    ticket pushes a fresh heap entry; the superseded one is skipped when
+    it surfaces.
+
+    An escalation is a conditional update on the ticket version read
+    from the change log, so when several worker processes run a
+    scheduler only one of them escalates a given deadline.
+    """
+
+    NOT_STARTED_STATUSES = ('Open', 'Assigned')
+    CLOSED_STATUSES = ('Resolved', 'Closed')
+    FIELDS = ['created_timestamp', 'priority', 'status', 'version', 'assigned_team',
+              'escalation_level', 'escalated_timestamp']
+
+    def __init__(self, db, router, escalation_hours=8, poll_interval=5.0, on_escalate=None):
+        """
+        Initialize scheduler and load the deadlines of open tickets
+
+        Args:
+            db (TicketDatabase): Ticket database
+            router (TicketRouter): Source of SLA_TARGETS and team workload
+            escalation_hours (float): Interval between repeat escalations
+                of a ticket past its resolution target
+            poll_interval (float): Seconds between change log checks
+            on_escalate (callable): Called with (ticket, reason, team)
+                after each escalation, e.g. to send a notification
+        """
+        self.db = db
+        self.router = router
+        self.escalation_seconds = int(float(escalation_hours) * 3600)
+        self.poll_interval = max(float(poll_interval), 0.1)
+        self.on_escalate = on_escalate
+
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._since = None
+        self._tickets = {}
+        self._due = {}
+        self._heap = []
+        self._started_at = db.to_epoch(datetime.now())
+
+        self.load()
+        db.add_change_listener(self._wake.set)
+
+    def __len__(self):
+        """Number of tickets with a pending deadline"""
+        return len(self._due)
+
+    def load(self):
+        """Schedule every open ticket from the database"""
+        with self._lock:
+            self._tickets, self._due, self._heap = {}, {}, []
+            since, tickets = self.db.get_open_tickets(self.FIELDS, self.CLOSED_STATUSES)
+            for ticket in tickets:
+                self._schedule(ticket)
+            self._since = since
+
+    def sync(self):
+        """Reschedule tickets changed since the last sync"""
+        with self._lock:
+            while True:
+                changes = self.db.get_changes(self._since, fields=self.FIELDS)
+                if changes['reset']:
+                    self.load()
+                    return
+                for ticket in changes['tickets']:
+                    self._schedule(ticket)
+                for ticket_id in changes['removed']:
+                    self._unschedule(ticket_id)
+                self._since = changes['next_since']
+                if not changes['has_more']:
+                    break
+
+    def next_deadline(self, ticket):
+        """
+        Get a ticket's pending SLA deadline
+
+        Deadlines before the scheduler started are skipped (see the class
+        docstring).
+
+        Returns:
+            tuple: (kind, epoch seconds), or None when nothing is pending
+        """
+        status = ticket.get('status')
+        if status in self.CLOSED_STATUSES:
+            return None
+        sla = self.router.get_sla_targets(ticket.get('priority'))
+        created = self.db.to_epoch(ticket['created_timestamp'])
+        escalated = self.db.to_epoch(ticket.get('escalated_timestamp'))
+        resolution_due = created + int(sla['resolution_hours'] * 3600)
+        start = self._started_at
+
+        if escalated is None and status in self.NOT_STARTED_STATUSES:
+            response_due = created + int(sla['response_hours'] * 3600)
+            if response_due >= start:
+                return 'response', response_due
+        if escalated is None or escalated < resolution_due:
+            if resolution_due >= start:
+                return 'resolution', resolution_due
+            if escalated is None:
+                # Missed while not running; escalate late rather than never
+                return 'overdue', start + self.escalation_seconds
+            # Missed while not running; repeat as if it had fired on time
+            escalated = resolution_due
+        due = escalated + self.escalation_seconds
+        if due < start and self.escalation_seconds > 0:
+            # Next repeat after startup
+            missed = -(-(start - due) // self.escalation_seconds)
+            due += missed * self.escalation_seconds
+        return 'overdue', due
+
+    def _schedule(self, ticket):
+        """Set or replace a ticket's pending deadline"""
+        ticket_id = ticket['ticket_id']
+        deadline = self.next_deadline(ticket)
+        if deadline is None:
+            self._unschedule(ticket_id)
+            return
+        kind, due = deadline
+        self._tickets[ticket_id] = dict(ticket, sla_kind=kind)
+        if self._due.get(ticket_id) != due:
+            self._due[ticket_id] = due
+            heapq.heappush(self._heap, (due, ticket_id))
+            if len(self._heap) > 2 * len(self._due) + 1024:
+                self._heap = [(due, ticket_id) for ticket_id, due in self._due.items()]
+                heapq.heapify(self._heap)
+
+    def _unschedule(self, ticket_id):
+        """Drop a ticket's pending deadline"""
+        self._tickets.pop(ticket_id, None)
+        self._due.pop(ticket_id, None)
+
+    def _pop_due(self, now):
+        """Take the tickets whose deadline is at or before ``now``"""
+        due_tickets = []
+        while self._heap and self._heap[0][0] <= now:
+            due, ticket_id = heapq.heappop(self._heap)
+            if self._due.get(ticket_id) == due:
+                del self._due[ticket_id]
+                due_tickets.append(self._tickets.pop(ticket_id))
+        return due_tickets
+
+    def run_pending(self, now=None):
+        """
+        Escalate every ticket whose deadline has passed
+
+        Args:
+            now (datetime): Current time (defaults to now)
+
+        Returns:
+            int: Number of tickets escalated
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self.sync()
+            due_tickets = self._pop_due(self.db.to_epoch(now))
+
+        escalated = 0
+        for ticket in due_tickets:
+            try:
+                escalated += self._escalate(ticket, now)
+            except Exception as e:
+                print(f"Error escalating ticket {ticket['ticket_id']}: {str(e)}")
+        return escalated
+
+    def _escalate(self, ticket, now):
+        """Reassign a ticket to its escalation team and record why"""
+        ticket_id = ticket['ticket_id']
+        priority = ticket.get('priority')
+        sla = self.router.get_sla_targets(priority)
+        kind = ticket['sla_kind']
+        if kind == 'response':
+            reason = f"{priority} response target of {sla['response_hours']}h missed"
+        elif kind == 'resolution':
+            reason = f"{priority} resolution target of {sla['resolution_hours']}h missed"
+        elif ticket.get('escalated_timestamp') is None:
+            reason = (f"{priority} resolution target of {sla['resolution_hours']}h missed "
+                      f"while the SLA monitor was not running; escalated late")
+        else:
+            reason = f"{priority} ticket still unresolved {self.escalation_seconds // 3600}h after last escalation"
+
+        updates = {
+            'escalation_level': (ticket.get('escalation_level') or 0) + 1,
+            'escalated_timestamp': now.isoformat(),
+            'performed_by': 'SLA Monitor',
+        }
+        teams = [team for team in sla.get('escalate_to', []) if team != ticket.get('assigned_team')]
+        team = member = None
+        if teams:
+            team, member = self.router.workload.pick(teams[0], ticket_id)
+            updates.update({
+                'assigned_team': team,
+                'assigned_to': member,
+                'status': 'Assigned' if member != 'Unassigned' else 'Open',
+            })
+            reason += f'; escalated to {team} ({member})'
+
+        escalated = False
+        try:
+            escalated = self.db.update_ticket(ticket_id, updates, expected_version=ticket['version'],
+                                              action='Escalated', details=reason)
+        finally:
+            # The picked member does not get the ticket after all
+            if not escalated and member is not None:
+                self.router.workload.release(ticket_id)
+        # A concurrent change (or another process's scheduler) moved the
+        # version on; the change log brings its new deadline
+        if not escalated:
+            return 0
+        if self.on_escalate:
+            self.on_escalate(self.db.get_ticket(ticket_id), reason, team or ticket.get('assigned_team'))
+        return 1
+
+    def start(self):
+        """Start the scheduler thread if it is not running in this process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            # Threads do not survive fork; start a fresh scheduler per process
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='sla-escalation', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Scheduler thread main loop"""
+        while True:
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"SLA scheduler error: {str(e)}")
+            with self._lock:
+                next_due = self._heap[0][0] if self._heap else None
+            timeout = self.poll_interval
+            if next_due is not None:
+                now = self.db.to_epoch(datetime.now())
+                timeout = min(timeout, max(next_due - now, 0))
+            # Local writes wake the thread early through the change listener
+            self._wake.wait(timeout)
+            self._wake.clear()
@@ -0,0 +1,281 @@
+"""
+Team Workload Module
+Live open-ticket counts per support member and team for load-balanced assignment
+"""
+
+import heapq
+import threading
+import time
+
+
+class TeamWorkload:
+    """
+    Open-ticket counts per member and team with least-loaded selection
+
+    Each team keeps a min-heap of (load, member) entries. A load change
+    pushes a fresh entry instead of re-sorting, and stale entries are
+    skipped when they surface, so picking a member is O(log n).
+
+    Counts are seeded from the database and kept current by applying the
+    ticket change log (see TicketDatabase.get_changes), so resolutions,
+    reassignments and claims made by any endpoint or worker process are
+    reflected without explicit hooks. Picks only read the log after a
+    write from this process (via the change listener) or once
+    ``sync_interval`` has passed, so other processes' writes show up
+    within that interval. A member picked for a ticket is held as a
+    reservation on that ticket ID until the change log shows the ticket
+    in any state (or ``reservation_seconds`` pass), so a ticket reassigned
+    and then resolved between two syncs leaves no stale count behind.
+    """
+
+    CLOSED_STATUSES = ('Resolved', 'Closed')
+    UNASSIGNED = 'Unassigned'
+
+    def __init__(self, teams, db=None, reservation_seconds=300, sync_interval=1.0):
+        """
+        Initialize workload tracker
+
+        Args:
+            teams (dict): Team definitions with 'members', 'max_capacity'
+                and optional 'escalation_team' (TicketRouter.SUPPORT_TEAMS)
+            db (TicketDatabase): Database to seed from and follow, or None
+                to count this process's assignments only
+            reservation_seconds (float): How long a pick waits to be stored
+            sync_interval (float): Longest a pick goes without reading the
+                change log
+        """
+        self.teams = teams
+        self.db = db
+        self.reservation_seconds = float(reservation_seconds)
+        self.sync_interval = float(sync_interval)
+
+        self._lock = threading.RLock()
+        self._since = None
+        self._tickets = {}
+        self._member_load = {}
+        self._team_load = {}
+        self._heaps = {}
+        # ticket_id -> ((team, member), picked at), oldest first
+        self._reservations = {}
+        # member -> [(team, index in its member list)], in team order
+        self._member_teams = {}
+        for name, team in teams.items():
+            for index, member in enumerate(team.get('members', [])):
+                self._member_teams.setdefault(member, []).append((name, index))
+        self._stale = True
+        self._synced_at = 0.0
+        self._reset()
+        if db is not None:
+            self.load()
+            db.add_change_listener(self._mark_stale)
+
+    def _reset(self):
+        """Forget every count"""
+        self._tickets = {}
+        self._member_load = {}
+        self._team_load = {name: 0 for name in self.teams}
+        self._reservations = {}
+        self._heaps = {
+            name: [(0, index, member) for index, member in enumerate(team.get('members', []))]
+            for name, team in self.teams.items()
+        }
+
+    def load(self):
+        """Recount open assigned tickets from the database"""
+        with self._lock:
+            self._reset()
+            since, rows = self.db.get_open_assignments(self.CLOSED_STATUSES)
+            for ticket_id, team, member in rows:
+                self._apply(ticket_id, (self._team_of(team, member), member))
+            self._since = since
+
+    def _mark_stale(self):
+        """Change listener: this process wrote, sync before the next pick"""
+        self._stale = True
+
+    def _refresh(self):
+        """Sync if this process wrote or sync_interval passed since the last sync"""
+        if self._stale or time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Apply ticket changes logged since the last sync"""
+        with self._lock:
+            # Cleared first so a write landing mid-sync marks it again
+            self._stale = False
+            self._synced_at = time.monotonic()
+            while self.db is not None:
+                changes = self.db.get_changes(self._since, fields=['assigned_team', 'assigned_to', 'status'])
+                if changes['reset']:
+                    self.load()
+                    return
+                for ticket in changes['tickets']:
+                    self._apply(ticket['ticket_id'], self._state(ticket))
+                for ticket_id in changes['removed']:
+                    self._apply(ticket_id, None)
+                self._since = changes['next_since']
+                if not changes['has_more']:
+                    break
+            self._expire_reservations()
+
+    def _state(self, ticket):
+        """Get the (team, member) a ticket counts against, or None"""
+        member = ticket.get('assigned_to')
+        if ticket.get('status') in self.CLOSED_STATUSES or not member or member == self.UNASSIGNED:
+            return None
+        return self._team_of(ticket.get('assigned_team'), member), member
+
+    def _team_of(self, team, member):
+        """
+        Get the team a ticket counts against
+
+        Tickets created before teams were stored have no assigned_team;
+        they count against the first team listing their assignee.
+        """
+        if team is None and member in self._member_teams:
+            return self._member_teams[member][0][0]
+        return team
+
+    def _apply(self, ticket_id, state):
+        """Move one ticket's count to its current (team, member) state"""
+        reserved = self._reservations.pop(ticket_id, None)
+        if reserved is not None:
+            # The ticket's stored state is counted from now on instead
+            self._adjust(reserved[0], -1)
+        old = self._tickets.pop(ticket_id, None)
+        if old == state:
+            if state is not None:
+                self._tickets[ticket_id] = state
+            return
+        if old is not None:
+            self._adjust(old, -1)
+        if state is None:
+            return
+        self._tickets[ticket_id] = state
+        self._adjust(state, 1)
+
+    def _adjust(self, state, delta):
+        """Change the open-ticket count of a member and their ticket's team"""
+        team, member = state
+        load = self._member_load.get(member, 0) + delta
+        self._member_load[member] = load
+        if team in self._team_load:
+            self._team_load[team] += delta
+        for name, index in self._member_teams.get(member, ()):
+            heap = self._heaps[name]
+            heapq.heappush(heap, (load, index, member))
+            if len(heap) > 4 * len(self.teams[name]['members']) + 8:
+                self._compact_heap(name)
+
+    def _compact_heap(self, team):
+        """Drop stale heap entries"""
+        members = self.teams[team].get('members', [])
+        self._heaps[team] = [(self._member_load.get(member, 0), index, member)
+                             for index, member in enumerate(members)]
+        heapq.heapify(self._heaps[team])
+
+    def _least_loaded(self, team):
+        """Get the member of a team with the fewest open tickets, or None"""
+        heap = self._heaps.get(team)
+        while heap:
+            load, _index, member = heap[0]
+            if load == self._member_load.get(member, 0):
+                return member
+            heapq.heappop(heap)
+        return None
+
+    def _expire_reservations(self):
+        """Release picks whose ticket never reached the database"""
+        cutoff = time.monotonic() - self.reservation_seconds
+        with self._lock:
+            while self._reservations:
+                ticket_id = next(iter(self._reservations))
+                state, picked_at = self._reservations[ticket_id]
+                if picked_at >= cutoff:
+                    break
+                del self._reservations[ticket_id]
+                self._adjust(state, -1)
+
+    def release(self, ticket_id):
+        """Give back the pick for a ticket that was not stored after all"""
+        with self._lock:
+            reserved = self._reservations.pop(ticket_id, None)
+            if reserved is not None:
+                self._adjust(reserved[0], -1)
+
+    def is_full(self, team):
+        """Whether a team has reached its max_capacity of open tickets"""
+        capacity = self.teams[team].get('max_capacity')
+        return capacity is not None and self._team_load.get(team, 0) >= capacity
+
+    def pick(self, team, ticket_id=None):
+        """
+        Choose the least-loaded member for a ticket of ``team``
+
+        A full team hands the ticket to its escalation_team (and so on);
+        when every team on the way is full the ticket stays unassigned in
+        the original team's queue.
+
+        Args:
+            team (str): Team the ticket was routed to
+            ticket_id (str): ID the ticket is (or will be) stored under;
+                the pick is held until it shows up in the change log or
+                is given back with release(). Without one the pick only
+                expires after ``reservation_seconds``.
+
+        Returns:
+            tuple: (team name, member name or 'Unassigned')
+        """
+        with self._lock:
+            self._refresh()
+            if ticket_id is None:
+                # Nothing will claim it; it only expires
+                ticket_id = object()
+            else:
+                # A repeat pick for the same ticket replaces the first
+                self.release(ticket_id)
+            candidate, seen = team, set()
+            while candidate in self.teams and candidate not in seen:
+                seen.add(candidate)
+                member = self._least_loaded(candidate)
+                if member is not None and not self.is_full(candidate):
+                    state = (candidate, member)
+                    self._adjust(state, 1)
+                    self._reservations[ticket_id] = (state, time.monotonic())
+                    return candidate, member
+                candidate = self.teams[candidate].get('escalation_team')
+            return team, self.UNASSIGNED
+
+    def pick_team(self, team):
+        """Get the first team on the escalation path of ``team`` that is not full"""
+        with self._lock:
+            self._refresh()
+            candidate, seen = team, set()
+            while candidate in self.teams and candidate not in seen:
+                seen.add(candidate)
+                if not self.is_full(candidate):
+                    return candidate
+                candidate = self.teams[candidate].get('escalation_team')
+            return team
+
+    def snapshot(self):
+        """
+        Get current load per team
+
+        Returns:
+            dict: team -> open_tickets, max_capacity, available and
+            per-member open ticket counts
+        """
+        with self._lock:
+            self.sync()
+            report = {}
+            for name, team in self.teams.items():
+                capacity = team.get('max_capacity')
+                load = self._team_load.get(name, 0)
+                report[name] = {
+                    'open_tickets': load,
+                    'max_capacity': capacity,
+                    'available': max(capacity - load, 0) if capacity is not None else None,
+                    'members': {member: self._member_load.get(member, 0) for member in team.get('members', [])},
+                }
+            return report
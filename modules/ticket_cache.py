@@ -0,0 +1,110 @@
+"""
+Ticket Cache Module
+Bounded in-process LRU cache for ticket detail records
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+
+
+class TicketCache:
+    """
+    Thread-safe LRU cache of ticket records keyed by ticket ID
+
+    Writers call ``invalidate`` after their transaction commits. A reader
+    that loaded a record while an invalidation was in flight must not put
+    its (possibly stale) copy back, so loads take a ``token`` before
+    reading the database and ``put`` drops the value if any invalidation
+    happened since.
+    """
+
+    def __init__(self, max_size=1024):
+        """
+        Initialize cache
+
+        Args:
+            max_size (int): Maximum number of records kept; 0 disables caching
+        """
+        self.max_size = max(int(max_size), 0)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    @property
+    def enabled(self):
+        """Whether the cache holds anything at all"""
+        return self.max_size > 0
+
+    def token(self):
+        """Get a token to pass to ``put`` for a load that starts now"""
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        """
+        Look up a record
+
+        Returns:
+            A copy of the cached value, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._metrics['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics['hits'] += 1
+        # Callers are free to modify what they get back
+        return copy.deepcopy(value)
+
+    def put(self, key, value, token=None):
+        """
+        Store a record, evicting the least recently used one when full
+
+        Args:
+            key: Ticket ID
+            value: Record to cache (copied)
+            token: Value of ``token()`` taken before the record was read
+        """
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._metrics['evictions'] += 1
+
+    def invalidate(self, key):
+        """Drop one record after a write to it has committed"""
+        with self._lock:
+            self._generation += 1
+            self._metrics['invalidations'] += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every record"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get_metrics(self):
+        """Get hit/miss/eviction counters"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['size'] = len(self._entries)
+        metrics['max_size'] = self.max_size
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_rate'] = round(metrics['hits'] / lookups, 4) if lookups else 0
+        return metrics
@@ -4,6 +4,81 @@ Rule-based logic for automatic ticket assignment to support teams
 """
 
 import json
+import re
+
+try:
+    from .team_workload import TeamWorkload
+except ImportError:
+    from team_workload import TeamWorkload
+
+
+class RoutingRuleIndex:
+    """
+    Routing keywords compiled for single-pass matching
+    
+    Rules map a keyword or phrase to a team, optionally with a weight:
+    ``{'vpn': 'Network Support', 'active directory': ('Access & Security', 3)}``.
+    Every rule is tokenized into a trie keyed by token, whose first level
+    is a plain hash lookup. Text is matched in one pass over its tokens,
+    advancing the partial phrase matches still open at each token, so the
+    cost depends on the text length and the longest phrase, not on how
+    many rules there are.
+    """
+    
+    TOKEN_PATTERN = re.compile(r'\w+')
+    
+    # Trie key holding the (team, weight) rules that end at a node;
+    # tokens are always strings so it cannot clash with one
+    _END = None
+    
+    def __init__(self, rules):
+        """
+        Compile routing rules
+        
+        Args:
+            rules (dict): keyword/phrase -> team or (team, weight); a
+                phrase's default weight is its token count
+        """
+        self.root = {}
+        self.size = 0
+        for phrase, target in rules.items():
+            team, weight = target if isinstance(target, tuple) else (target, None)
+            tokens = self.tokenize(phrase)
+            if not tokens:
+                continue
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(self._END, []).append((team, weight if weight is not None else len(tokens)))
+            self.size += 1
+    
+    @classmethod
+    def tokenize(cls, text):
+        """Split text into lowercase word tokens"""
+        return cls.TOKEN_PATTERN.findall((text or '').lower())
+    
+    def matches(self, tokens):
+        """
+        Find every rule occurring in a token sequence
+        
+        Yields:
+            tuple: (index of the match's last token, team, weight)
+        """
+        root, end = self.root, self._END
+        active = []
+        for index, token in enumerate(tokens):
+            advanced = []
+            for node in active:
+                child = node.get(token)
+                if child is not None:
+                    advanced.append(child)
+            child = root.get(token)
+            if child is not None:
+                advanced.append(child)
+            for node in advanced:
+                for team, weight in node.get(end, ()):
+                    yield index, team, weight
+            active = advanced
 
 
 class TicketRouter:
@@ -15,55 +90,64 @@ class TicketRouter:
             'email': 'network-support@company.com',
             'members': ['John Tech', 'Sarah Net'],
             'expertise': ['network', 'connection', 'wifi', 'internet', 'lan', 'vpn'],
-            'max_capacity': 20
+            'max_capacity': 20,
+            'escalation_team': 'General Support'
         },
         'Email & Collaboration': {
             'email': 'email-support@company.com',
             'members': ['Mike Mail', 'Emma Send'],
             'expertise': ['email', 'outlook', 'exchange', 'teams', 'sharepoint'],
-            'max_capacity': 15
+            'max_capacity': 15,
+            'escalation_team': 'General Support'
         },
         'Access & Security': {
             'email': 'access-support@company.com',
             'members': ['Alex Auth', 'Diana Access'],
             'expertise': ['login', 'authentication', 'credentials', 'password', 'access', 'active directory', 'ad'],
-            'max_capacity': 20
+            'max_capacity': 20,
+            'escalation_team': 'Security Team'
         },
         'Hardware Support': {
             'email': 'hardware-support@company.com',
             'members': ['Bob Hardware', 'Carol PC'],
             'expertise': ['monitor', 'keyboard', 'mouse', 'printer', 'hardware', 'device', 'laptop'],
-            'max_capacity': 15
+            'max_capacity': 15,
+            'escalation_team': 'General Support'
         },
         'Software Support': {
             'email': 'software-support@company.com',
             'members': ['Tom App', 'Lisa Update'],
             'expertise': ['software', 'application', 'installation', 'update', 'patch', 'license'],
-            'max_capacity': 20
+            'max_capacity': 20,
+            'escalation_team': 'General Support'
         },
         'Database Support': {
             'email': 'database-support@company.com',
             'members': ['Dave DB', 'Nina Data'],
             'expertise': ['database', 'sql', 'backend', 'data', 'query'],
-            'max_capacity': 10
+            'max_capacity': 10,
+            'escalation_team': 'General Support'
         },
         'Security Team': {
             'email': 'security-support@company.com',
             'members': ['Steve Security', 'Victoria Guard'],
             'expertise': ['security', 'antivirus', 'firewall', 'vpn', 'encryption', 'malware'],
-            'max_capacity': 12
+            'max_capacity': 12,
+            'escalation_team': 'General Support'
         },
         'Performance Team': {
             'email': 'performance-support@company.com',
             'members': ['Pete Speed', 'Rose Fast'],
             'expertise': ['slow', 'crash', 'freeze', 'hang', 'performance', 'speed', 'lag'],
-            'max_capacity': 18
+            'max_capacity': 18,
+            'escalation_team': 'General Support'
         },
         'General Support': {
             'email': 'general-support@company.com',
             'members': ['Susan Help', 'Paul Support'],
             'expertise': [],
-            'max_capacity': 30
+            'max_capacity': 30,
+            'escalation_team': None
         }
     }
     
@@ -91,10 +175,34 @@ class TicketRouter:
         }
     }
     
-    def __init__(self):
-        """Initialize router"""
-        self.routing_rules = self._load_routing_rules()
-        self.team_workload = {team: 0 for team in self.SUPPORT_TEAMS.keys()}
+    # Category keywords count this many times more than description ones
+    CATEGORY_WEIGHT = 5
+    
+    def __init__(self, workload=None):
+        """
+        Initialize router
+        
+        Args:
+            workload (TeamWorkload): Shared open-ticket counts; a private
+                in-memory tracker is used when omitted
+        """
+        self.reload_rules()
+        self.workload = workload or TeamWorkload(self.SUPPORT_TEAMS)
+    
+    def reload_rules(self, rules=None):
+        """
+        Recompile the routing rules
+        
+        The new index replaces the old one in a single assignment, so
+        tickets routed meanwhile use one rule set or the other.
+        
+        Args:
+            rules (dict): keyword/phrase -> team or (team, weight), or
+                None to reload the configured rules
+        """
+        routing_rules = rules if rules is not None else self._load_routing_rules()
+        self._rule_index = RoutingRuleIndex(routing_rules)
+        self.routing_rules = routing_rules
     
     def _load_routing_rules(self):
         """Load routing rules from configuration"""
@@ -154,12 +262,14 @@ class TicketRouter:
             'lag': 'Performance Team',
         }
     
-    def route_ticket(self, ticket_data):
+    def route_ticket(self, ticket_data, assign_member=True):
         """
         Route ticket to appropriate team based on category and priority
         
         Args:
             ticket_data (dict): Processed ticket data
+            assign_member (bool): Pick a team member too, or leave the
+                ticket 'Unassigned' in the team queue
             
         Returns:
             dict: Routing decision with team assignment
@@ -169,10 +279,17 @@ class TicketRouter:
         description = ticket_data.get('corrected_description', '').lower()
         
         # Find best matching team
-        assigned_team = self._determine_team(category, description)
+        matched_team = self._determine_team(category, description)
         
         # Get specific team member based on workload
-        team_member = self._assign_team_member(assigned_team)
+        if assign_member:
+            assigned_team, team_member = self._assign_team_member(matched_team, ticket_data.get('ticket_id'))
+        else:
+            assigned_team, team_member = self.workload.pick_team(matched_team), 'Unassigned'
+        
+        routing_reason = f"Matched team based on category: {category}"
+        if assigned_team != matched_team:
+            routing_reason += f" ({matched_team} at capacity, escalated)"
         
         # Get SLA information
         sla = self.SLA_TARGETS.get(priority, self.SLA_TARGETS['P3 - Medium'])
@@ -184,47 +301,67 @@ class TicketRouter:
             'priority': priority,
             'sla_response_hours': sla['response_hours'],
             'sla_resolution_hours': sla['resolution_hours'],
-            'routing_reason': f"Matched team based on category: {category}"
+            'routing_reason': routing_reason
         }
     
+    def score_teams(self, category, description):
+        """
+        Score the teams whose routing keywords occur in a ticket
+        
+        Returns:
+            dict: team -> (score, position of its first match); category
+            matches come before every description position
+        """
+        index = self._rule_index
+        scores = {}
+        category_tokens = index.tokenize(category)
+        for tokens, multiplier, offset in ((category_tokens, self.CATEGORY_WEIGHT, 0),
+                                           (index.tokenize(description), 1, len(category_tokens))):
+            for position, team, weight in index.matches(tokens):
+                score, first = scores.get(team, (0, position + offset))
+                scores[team] = (score + weight * multiplier, first)
+        return scores
+    
     def _determine_team(self, category, description):
         """Determine the best team for the ticket"""
-        # First try category match
-        for keyword, team in self.routing_rules.items():
-            if keyword in category.lower():
-                return team
-        
-        # Then try keywords in description
-        words = description.split()
-        for word in words:
-            if word in self.routing_rules:
-                return self.routing_rules[word]
-        
-        # Default to General Support
-        return 'General Support'
+        scores = self.score_teams(category, description)
+        if not scores:
+            # Default to General Support
+            return 'General Support'
+        # Highest score wins; ties go to the team matched first
+        return min(scores, key=lambda team: (-scores[team][0], scores[team][1]))
     
-    def _assign_team_member(self, team_name):
+    def _assign_team_member(self, team_name, ticket_id=None):
         """
         Assign specific team member with load balancing
         
+        Picks the member with the fewest open tickets. A team at its
+        max_capacity passes the ticket on to its escalation_team.
+        
         Args:
             team_name (str): Name of the team
+            ticket_id (str): ID the ticket will be stored under, which
+                holds the pick until the ticket is stored
             
         Returns:
-            str: Assigned team member name
+            tuple: (team name, assigned team member name)
         """
-        team = self.SUPPORT_TEAMS.get(team_name)
-        if not team or not team['members']:
-            return 'Unassigned'
-        
-        # For now, return first available member
-        # In production, use load balancing from actual workload
-        return team['members'][0]
+        if team_name not in self.SUPPORT_TEAMS:
+            return team_name, 'Unassigned'
+        return self.workload.pick(team_name, ticket_id)
     
     def get_team_info(self, team_name):
         """Get detailed team information"""
         return self.SUPPORT_TEAMS.get(team_name, {})
     
+    def get_member_teams(self, member):
+        """Get the names of the teams a support member belongs to"""
+        return [name for name, team in self.SUPPORT_TEAMS.items() if member in team['members']]
+    
+    def get_team_load(self):
+        """Get current open-ticket counts per team and member"""
+        return self.workload.snapshot()
+    
     def get_all_teams(self):
         """Get list of all support teams"""
         return list(self.SUPPORT_TEAMS.keys())
@@ -237,21 +374,29 @@ class TicketRouter:
 class TicketAssignment:
     """High-level ticket assignment coordinator"""
     
-    def __init__(self):
-        """Initialize assignment coordinator"""
-        self.router = TicketRouter()
+    def __init__(self, db=None):
+        """
+        Initialize assignment coordinator
+        
+        Args:
+            db (TicketDatabase): Database whose open tickets seed and keep
+                the team workload counts current
+        """
+        workload = TeamWorkload(TicketRouter.SUPPORT_TEAMS, db) if db is not None else None
+        self.router = TicketRouter(workload)
     
-    def assign_ticket(self, ticket_data):
+    def assign_ticket(self, ticket_data, assign_member=True):
         """
         Assign a ticket with full business logic
         
         Args:
             ticket_data (dict): Ticket information including processed data
+            assign_member (bool): Pick a team member, or only the team
             
         Returns:
             dict: Complete assignment details
         """
-        routing = self.router.route_ticket(ticket_data)
+        routing = self.router.route_ticket(ticket_data, assign_member)
         
         assignment = {
             'ticket_id': ticket_data.get('ticket_id'),
@@ -261,8 +406,18 @@ class TicketAssignment:
             'priority': routing['priority'],
             'sla_response_hours': routing['sla_response_hours'],
             'sla_resolution_hours': routing['sla_resolution_hours'],
-            'status': 'Assigned',
+            'status': 'Assigned' if routing['assigned_to'] != 'Unassigned' else 'Open',
             'assignment_timestamp': __import__('datetime').datetime.now().isoformat()
         }
         
         return assignment
+    
+    def release(self, assignment):
+        """
+        Give back the member picked for a ticket that was not stored
+        
+        Args:
+            assignment (dict): Result of assign_ticket
+        """
+        if assignment.get('ticket_id') is not None:
+            self.router.workload.release(assignment['ticket_id'])
@@ -0,0 +1,183 @@
+"""
+Group Commit Write Queue Module
+Funnels database writes through a single writer thread that commits them in batches
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class GroupCommitWriter:
+    """
+    Single-writer queue that groups concurrent writes into one transaction
+
+    Callers submit write operations (callables taking a connection) and
+    receive a Future. The writer thread collects every operation that
+    arrives within ``max_delay_ms`` of the first one (up to ``max_batch``),
+    runs each inside its own SAVEPOINT and commits the whole group once.
+    A failing operation only rolls back its own savepoint and fails its own
+    Future; the rest of the group still commits.
+
+    The writer serializes writes within one process. Separate worker
+    processes each run their own writer and still rely on the SQLite
+    busy timeout between them, but take the write lock once per group
+    instead of once per write.
+    """
+
+    _STOP = object()
+
+    def __init__(self, pool, max_delay_ms=2, max_batch=256):
+        """
+        Initialize writer
+
+        Args:
+            pool (ConnectionPool): Pool the writer takes its connection from
+            max_delay_ms (float): How long to wait for more writes after the first
+            max_batch (int): Maximum number of writes per transaction
+        """
+        self.pool = pool
+        self.max_delay = max(float(max_delay_ms), 0.0) / 1000.0
+        self.max_batch = max(int(max_batch), 1)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._conn = None
+        self._pid = None
+
+        self._metrics = {
+            'writes': 0,
+            'failed_writes': 0,
+            'batches': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'max_queue_depth': 0,
+        }
+
+    def start(self):
+        """Start the writer thread if it is not running in this process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            # Threads do not survive fork; start a fresh writer per process
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='ticket-db-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Flush pending writes and stop the writer thread"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        thread.join(timeout)
+
+    def submit(self, operation):
+        """
+        Queue a write operation
+
+        Args:
+            operation (callable): Function called as operation(conn) inside
+                the group transaction; its return value resolves the Future
+
+        Returns:
+            Future: Resolved once the group containing the write has committed
+        """
+        if threading.current_thread() is self._thread:
+            # Writes issued from inside a queued operation join its transaction
+            future = Future()
+            future.set_result(operation(self._conn))
+            return future
+
+        self.start()
+        future = Future()
+        self._queue.put((operation, future))
+
+        depth = self._queue.qsize()
+        if depth > self._metrics['max_queue_depth']:
+            self._metrics['max_queue_depth'] = depth
+        return future
+
+    def execute(self, operation):
+        """Submit a write operation and wait for its result"""
+        return self.submit(operation).result()
+
+    def get_metrics(self):
+        """Get batch size and queue depth metrics"""
+        metrics = dict(self._metrics)
+        metrics['queue_depth'] = self._queue.qsize()
+        metrics['avg_batch_size'] = (
+            round(metrics['writes'] / metrics['batches'], 2) if metrics['batches'] else 0
+        )
+        return metrics
+
+    def _collect(self, first):
+        """Gather writes arriving shortly after the first one"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is self._STOP:
+                break
+        return batch
+
+    def _run(self):
+        """Writer thread main loop"""
+        with self.pool.connection() as conn:
+            self._conn = conn
+            while True:
+                batch = self._collect(self._queue.get())
+                stop = batch[-1] is self._STOP
+                if stop:
+                    batch.pop()
+                if batch:
+                    self._commit(conn, batch)
+                if stop:
+                    break
+            self._conn = None
+
+    def _commit(self, conn, batch):
+        """Run one group of writes in a single transaction"""
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for operation, future in batch:
+                conn.execute('SAVEPOINT group_write')
+                try:
+                    results.append((future, operation(conn), None))
+                    conn.execute('RELEASE group_write')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO group_write')
+                    conn.execute('RELEASE group_write')
+                    results.append((future, None, e))
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for _, future in batch:
+                future.set_exception(e)
+            self._metrics['failed_writes'] += len(batch)
+            return
+
+        self._metrics['batches'] += 1
+        self._metrics['writes'] += len(batch)
+        self._metrics['last_batch_size'] = len(batch)
+        if len(batch) > self._metrics['max_batch_size']:
+            self._metrics['max_batch_size'] = len(batch)
+
+        # Resolve futures only after the group is durable
+        for future, result, error in results:
+            if error is not None:
+                self._metrics['failed_writes'] += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
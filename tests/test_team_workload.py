@@ -0,0 +1,74 @@
+"""
+Tests for TeamWorkload open-ticket counts
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from modules.database import TicketDatabase
+from modules.sla_scheduler import EscalationScheduler
+from modules.ticket_router import TicketAssignment
+
+
+@pytest.fixture
+def db(tmp_path):
+    return TicketDatabase(str(tmp_path / 'tickets.db'))
+
+
+def create_ticket(db, assignment, **fields):
+    ticket_data = {
+        'ticket_id': db.generate_ticket_id(),
+        'user_name': 'Test User',
+        'user_email': 'user@example.com',
+        'original_description': 'network down',
+        'corrected_description': 'network down',
+        'category': 'Network',
+        'priority': 'P1 - Critical',
+    }
+    ticket_data.update(fields)
+    routed = assignment.assign_ticket(ticket_data)
+    ticket_data['assigned_team'] = routed['assigned_team']
+    ticket_data['assigned_to'] = routed['assigned_to']
+    return db.create_assigned_ticket(ticket_data)
+
+
+def open_counts(assignment):
+    load = assignment.router.get_team_load()
+    return {member: count
+            for team in load.values()
+            for member, count in team['members'].items() if count}
+
+
+def test_escalated_then_resolved_ticket_leaves_no_count(db):
+    assignment = TicketAssignment(db)
+    ticket_id = create_ticket(db, assignment)
+    member = db.get_ticket(ticket_id)['assigned_to']
+    assert open_counts(assignment) == {member: 1}
+
+    # Push the ticket past its resolution target
+    created = datetime.now() - timedelta(days=1)
+    db._write(lambda conn: conn.execute(
+        'UPDATE tickets SET created_timestamp = ?, created_epoch = ? WHERE ticket_id = ?',
+        (created.isoformat(), db.to_epoch(created), ticket_id)))
+    scheduler = EscalationScheduler(db, assignment.router, escalation_hours=1)
+    assert scheduler.run_pending(datetime.now() + timedelta(hours=1, minutes=1)) == 1
+    assert db.get_ticket(ticket_id)['assigned_team'] == 'General Support'
+
+    # Resolved before the workload sees the escalated state
+    db.update_ticket(ticket_id, {'status': 'Resolved', 'performed_by': 'Test'})
+
+    assert open_counts(assignment) == {}
+    assert assignment.router.workload._reservations == {}
+
+
+def test_failed_create_releases_pick(db):
+    assignment = TicketAssignment(db)
+    ticket_data = {'ticket_id': db.generate_ticket_id(), 'category': 'Network',
+                   'corrected_description': 'network down'}
+    routed = assignment.assign_ticket(ticket_data)
+    assert open_counts(assignment) == {routed['assigned_to']: 1}
+
+    assignment.release(routed)
+
+    assert open_counts(assignment) == {}